@@ -97,13 +97,15 @@ def main():
     last_milli = time.time() * 1000 # uses millis, not secs
     this_milli = time.time() * 1000 # uses millis, not secs
 
-    # parses the list of servers specified at command line and creates corresponding URL for each, adding these to the dictionary
+    # parses the list of servers specified at command line and connects to each of them
+    # invocations are spread across the servers by the connection pool
     volt_servers = server_list.rsplit(",")
+    # the pool records the latency percentiles of each stored procedure
+    client = VoltClient(volt_servers, stats = ClientStats())
 
     # invokes the stored procedure 'Initialize' to set up database with contestant names/numbers
     # uses quick parse hack to process the response of the invocation
     # contestant names/numbers entered into database if this is the first client to connect; otherwise, existing configuration info retrieved
-    client = FastSerializer(volt_servers[0])
     initprocedure = VoltProcedure( client, "Initialize", [ FastSerializer.VOLTTYPE_INTEGER, FastSerializer.VOLTTYPE_STRING ])
 
     response = initprocedure.call( [max_contestant, contestant_names ] )
@@ -119,7 +121,7 @@ def main():
     thread_list = []
 
     for x in range(5):
-        thread = doQueries(volt_servers[x % len(volt_servers)])
+        thread = doQueries(client)
         thread.setDaemon(True)
         thread.start()
 
@@ -237,15 +239,22 @@ def main():
     print((" - Latency 150ms - 175ms = %d" % latency_counter[6]))
     print((" - Latency 175ms - 200ms = %d" % latency_counter[7]))
     print((" - Latency 200ms+        = %d" % latency_counter[8]))
+    # no percentiles without completed votes
+    vote_stats = client.stats.snapshot().get("Vote")
+    if vote_stats is not None and vote_stats["latency"]["count"] > 0:
+        latency = vote_stats["latency"]
+        server_p99 = vote_stats["server_latency"]["p99"]
+        print((" - Latency p50 = %.3f ms | p99 = %.3f ms | p99.9 = %.3f ms (server p99 = %s)" %
+               (latency["p50"], latency["p99"], latency["p99.9"],
+                "n/a" if server_p99 is None else "%.3f ms" % server_p99)))
 
 # class, whose objects run in separate threads
 # responsible for invoking stored procedure 'Vote' and processing results (updating statistics)
 class doQueries(threading.Thread):
-    # accepts url used to connect to server as parameter
-    # accepts data used to invoke stored procedure 'Vote' as parameter
-    def __init__ (self, server):
+    # accepts the connection pool shared by all threads as parameter
+    def __init__ (self, client):
         threading.Thread.__init__(self)
-        self.client = FastSerializer( server )
+        self.client = client
         self.proc = VoltProcedure( self.client, "Vote", [ FastSerializer.VOLTTYPE_BIGINT, FastSerializer.VOLTTYPE_TINYINT, FastSerializer.VOLTTYPE_BIGINT ])
 
     # the method that gets called when this new thread is started
@@ -0,0 +1,99 @@
+# This file is part of VoltDB.
+# Copyright (C) 2008-2025 Volt Active Data Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with VoltDB.  If not, see <http://www.gnu.org/licenses/>.
+
+# call_many() and invoke_many() with a row which can not be serialized in
+# the middle of param_rows, against a voltmock.py stand-in server: the rows
+# before it are sent, and the error is raised with their responses.
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from voltdbclient import AsyncFastSerializer, AsyncVoltProcedure, FastSerializer, VoltProcedure
+from voltmock import MockServer, table
+
+ROWS = [[1], [2], [3], ["not a number"], [5]]
+
+class CallManyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockServer()
+        self.server.add_procedure("Echo", handler = lambda params:
+                                  [table([("VALUE", FastSerializer.VOLTTYPE_BIGINT)], [params])])
+        self.host, self.port = self.server.run_in_thread()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def values(self, responses):
+        return [response.tables[0].tuples[0][0] for response in responses]
+
+    def check(self, fser):
+        procedure = VoltProcedure(fser, "Echo", [FastSerializer.VOLTTYPE_BIGINT])
+        with self.assertRaises(Exception) as raised:
+            procedure.call_many(ROWS)
+        self.assertEqual(self.values(raised.exception.responses), [1, 2, 3])
+        self.assertEqual(self.server.invocations["Echo"], 3)
+        # the connection is still usable
+        self.assertEqual(self.values(procedure.call_many([[6], [7]])), [6, 7])
+
+    def test_blocking(self):
+        fser = FastSerializer(self.host, self.port)
+        fser.BATCH_FLUSH_SIZE = 60  # the first batch is sent before the bad row
+        try:
+            self.check(fser)
+        finally:
+            fser.close()
+
+    def test_pipelined(self):
+        fser = FastSerializer(self.host, self.port)
+        fser.BATCH_FLUSH_SIZE = 60
+        fser.start_reader()
+        try:
+            self.check(fser)
+        finally:
+            fser.close()
+
+    def test_invoke_many(self):
+        fser = FastSerializer(self.host, self.port)
+        try:
+            procedure = VoltProcedure(fser, "Echo", [FastSerializer.VOLTTYPE_BIGINT])
+            with self.assertRaises(Exception) as raised:
+                fser.invoke_many(procedure, ROWS)
+            futures = raised.exception.futures
+            self.assertEqual(self.values(future.result(10) for future in futures), [1, 2, 3])
+        finally:
+            fser.close()
+
+    def test_async(self):
+        async def run():
+            fser = AsyncFastSerializer(self.host, self.port)
+            await fser.connect()
+            try:
+                procedure = AsyncVoltProcedure(fser, "Echo", [FastSerializer.VOLTTYPE_BIGINT])
+                with self.assertRaises(Exception) as raised:
+                    await procedure.call_many(ROWS)
+                self.assertEqual(self.values(raised.exception.responses), [1, 2, 3])
+                self.assertEqual(self.values(await procedure.call_many([[6]])), [6])
+            finally:
+                await fser.close()
+        asyncio.run(run())
+
+if __name__ == "__main__":
+    unittest.main()
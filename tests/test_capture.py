@@ -0,0 +1,80 @@
+# This file is part of VoltDB.
+# Copyright (C) 2008-2025 Volt Active Data Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with VoltDB.  If not, see <http://www.gnu.org/licenses/>.
+
+# Capture files of a connection on which a streamed response is abandoned
+# before the next call, against a voltmock.py stand-in server: each message
+# is one whole record, and voltreplay.py lists, decodes and sends them.
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from voltdbclient import CaptureWriter, FastSerializer, VoltProcedure, read_capture
+from voltmock import MockServer, table
+
+class CaptureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockServer()
+        # several stream chunks long
+        rows = [[i, "row %d" % i] for i in range(20000)]
+        self.server.add_procedure("Big", [table([("ID", FastSerializer.VOLTTYPE_BIGINT),
+                                                 ("NAME", FastSerializer.VOLTTYPE_STRING)], rows)])
+        self.server.add_procedure("Small", [table([("ID", FastSerializer.VOLTTYPE_BIGINT)], [[1]])])
+        self.host, self.port = self.server.run_in_thread()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "calls.capture")
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def replay(self, *args):
+        return subprocess.run([sys.executable, os.path.join(ROOT, "voltreplay.py")] + list(args),
+                              stdout = subprocess.PIPE, stderr = subprocess.PIPE, text = True, cwd = ROOT)
+
+    def test_abandoned_stream(self):
+        fser = FastSerializer(self.host, self.port, dump_file_path = self.path)
+        response = VoltProcedure(fser, "Big", []).call_streaming()
+        rows = next(response.iter_tables()).iter_rows()
+        self.assertEqual(list(next(rows)), [0, "row 0"])
+        # abandoned, with most of the response not received
+        response = VoltProcedure(fser, "Small", []).call()
+        self.assertEqual(response.tables[0].tuples, [[1]])
+        fser.close()
+
+        records = [record for record in read_capture(self.path) if not record.flags & CaptureWriter.LOGIN]
+        self.assertEqual([record.flags for record in records],
+                         [CaptureWriter.SENT, CaptureWriter.RECEIVED] * 2)
+        for record in records:
+            self.assertEqual(len(record.data), CaptureWriter.INT32.unpack_from(record.data)[0] + 4)
+        self.assertEqual(records[0].handle, records[1].handle)
+        self.assertEqual(records[2].handle, records[3].handle)
+        self.assertGreater(len(records[1].data), 4 * FastSerializer.STREAM_CHUNK)
+
+        for args in (["list", self.path], ["decode", "--repeat", "1", self.path],
+                     ["send", "--server", "%s:%d" % (self.host, self.port), self.path]):
+            result = self.replay(*args)
+            self.assertEqual(result.returncode, 0, result.stderr)
+
+if __name__ == "__main__":
+    unittest.main()
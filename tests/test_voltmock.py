@@ -0,0 +1,61 @@
+# This file is part of VoltDB.
+# Copyright (C) 2008-2025 Volt Active Data Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with VoltDB.  If not, see <http://www.gnu.org/licenses/>.
+
+# The parameters given to the handlers of voltmock.py procedures.
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from voltdbclient import FastSerializer, VoltProcedure
+from voltmock import GRACEFUL_FAILURE, MockServer, table
+
+class HandlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockServer()
+        self.received = []
+        def handler(params):
+            self.received.append(params)
+            if params[0] < 0:
+                raise ValueError("negative")
+            return [table([("COUNT", FastSerializer.VOLTTYPE_BIGINT)], [[len(params[1])]])]
+        self.server.add_procedure("Handled", handler = handler)
+        self.host, self.port = self.server.run_in_thread()
+        self.fser = FastSerializer(self.host, self.port)
+        self.procedure = VoltProcedure(self.fser, "Handled", [FastSerializer.VOLTTYPE_BIGINT,
+                                                              FastSerializer.VOLTTYPE_STRING,
+                                                              FastSerializer.VOLTTYPE_INTEGER])
+
+    def tearDown(self):
+        self.fser.close()
+        self.server.stop()
+
+    def test_array_parameters(self):
+        response = self.procedure.call([1, ["a", "b", None], [7, 8]])
+        self.assertEqual(response.status, 1)
+        self.assertEqual(response.tables[0].tuples, [[3]])
+        self.assertEqual(self.received, [[1, ["a", "b", None], [7, 8]]])
+
+    def test_handler_error(self):
+        response = self.procedure.call([-1, "x", 2])
+        self.assertEqual(response.status, GRACEFUL_FAILURE)
+        self.assertEqual(response.statusString, "negative")
+
+if __name__ == "__main__":
+    unittest.main()
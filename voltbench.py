@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# This file is part of VoltDB.
+# Copyright (C) 2008-2025 Volt Active Data Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with VoltDB.  If not, see <http://www.gnu.org/licenses/>.
+
+# Microbenchmarks of the client: the primitive readers, the encoding and
+# decoding of synthetic tables of various shapes, and invocations of a
+# voltmock.py stand-in server. Reports operations and bytes per second, and
+# saves the results as JSON to compare them across commits.
+
+import sys
+if sys.hexversion < 0x03060000:
+    raise Exception("Python version 3.6 or greater is required (3.9+ is preferred).")
+
+import argparse
+import datetime
+import decimal
+import json
+import math
+import platform
+import subprocess
+import time
+
+from voltdbclient import FastSerializer, Geography, VoltProcedure, VoltTable, XYZPoint, numpy_available
+from voltmock import MockServer, table
+
+# name -> function returning (operation, items per operation, bytes per operation)
+BENCHMARKS = {}
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+def reader(data):
+    # a FastSerializer reading data
+    fser = FastSerializer()
+    fser.read_buffer.wrap(data)
+    return fser
+
+def serialized(write):
+    fser = FastSerializer()
+    write(fser)
+    return fser.takeRawBytes()
+
+# primitive readers, on 1000 values
+
+def read_values(read, write, values):
+    data = serialized(lambda fser: [write(fser, value) for value in values])
+    fser = reader(data)
+    wrap = fser.read_buffer.wrap
+    def run():
+        wrap(data)
+        for i in range(len(values)):
+            read(fser)
+    return run, len(values), len(data)
+
+@benchmark("read/int64")
+def read_int64():
+    return read_values(FastSerializer.readInt64, FastSerializer.writeInt64, [i * 7919 for i in range(1000)])
+
+@benchmark("read/string")
+def read_string():
+    return read_values(FastSerializer.readString, FastSerializer.writeString, ["value %d" % i for i in range(1000)])
+
+@benchmark("read/decimal")
+def read_decimal():
+    return read_values(FastSerializer.readDecimal, FastSerializer.writeDecimal,
+                       [decimal.Decimal(i * 7919) / 1000 for i in range(1000)])
+
+@benchmark("read/timestamp")
+def read_timestamp():
+    start = datetime.datetime(2024, 1, 1)
+    return read_values(FastSerializer.readDate, FastSerializer.writeDate,
+                       [start + datetime.timedelta(seconds = i * 61) for i in range(1000)])
+
+@benchmark("read/geography_point")
+def read_geography_point():
+    return read_values(FastSerializer.readGeographyPoint, FastSerializer.writeGeographyPoint,
+                       [(i % 360 - 180.0, i % 180 - 90.0) for i in range(1000)])
+
+# tables of various shapes
+
+def polygon(i, vertices = 32):
+    # a polygon around a point which depends on i, counterclockwise, of
+    # XYZPoint vertices
+    lng, lat = i % 300 - 150.0, i % 120 - 60.0
+    loop = []
+    for k in range(vertices):
+        lng_k = math.radians(lng + math.cos(2 * math.pi * k / vertices))
+        lat_k = math.radians(lat + math.sin(2 * math.pi * k / vertices))
+        loop.append(XYZPoint(math.cos(lng_k) * math.cos(lat_k), math.sin(lng_k) * math.cos(lat_k), math.sin(lat_k)))
+    return Geography([loop])
+
+SHAPES = {
+    "narrow": lambda: table([("ID", FastSerializer.VOLTTYPE_BIGINT), ("VALUE", FastSerializer.VOLTTYPE_INTEGER)],
+                            [[i, i % 1000] for i in range(1000)]),
+    "wide": lambda: table([("C%d" % c, (FastSerializer.VOLTTYPE_BIGINT, FastSerializer.VOLTTYPE_FLOAT,
+                                        FastSerializer.VOLTTYPE_STRING, FastSerializer.VOLTTYPE_TIMESTAMP)[c % 4])
+                           for c in range(40)],
+                          [[(i, i * 0.5, "s%d" % i, i * 1000000)[c % 4] for c in range(40)] for i in range(100)]),
+    "many_rows": lambda: table([("ID", FastSerializer.VOLTTYPE_BIGINT), ("VALUE", FastSerializer.VOLTTYPE_FLOAT)],
+                               [[i, i * 0.25] for i in range(100000)]),
+    "strings": lambda: table([("KEY", FastSerializer.VOLTTYPE_STRING), ("VALUE", FastSerializer.VOLTTYPE_STRING)],
+                             [["key %d" % i, "value %d " % i * 8] for i in range(1000)]),
+    "decimals": lambda: table([("C%d" % c, FastSerializer.VOLTTYPE_DECIMAL) for c in range(4)],
+                              [[decimal.Decimal(i * 7919 + c) / 100 for c in range(4)] for i in range(1000)]),
+    "geography": lambda: table([("POINT", FastSerializer.VOLTTYPE_GEOGRAPHY_POINT),
+                                ("AREA", FastSerializer.VOLTTYPE_GEOGRAPHY)],
+                               [[(i % 360 - 180.0, i % 180 - 90.0), polygon(i)] for i in range(100)]),
+}
+
+def decode_table(shape, table_mode):
+    t = SHAPES[shape]()
+    data = serialized(t.writeToSerializer)
+    fser = FastSerializer(table_mode = table_mode)
+    wrap = fser.read_buffer.wrap
+    def run():
+        wrap(data)
+        VoltTable(fser).readFromSerializer()
+    return run, len(t.tuples), len(data)
+
+def encode_table(shape):
+    t = SHAPES[shape]()
+    fser = FastSerializer()
+    def run():
+        t.writeToSerializer(fser)
+        fser.wbuf.clear()
+    return run, len(t.tuples), len(serialized(t.writeToSerializer))
+
+for shape in SHAPES:
+    BENCHMARKS["table/decode/%s" % shape] = (lambda shape: lambda: decode_table(shape, FastSerializer.TABLE_ROWS))(shape)
+    BENCHMARKS["table/decode_lazy/%s" % shape] = (lambda shape: lambda: decode_table(shape, FastSerializer.TABLE_LAZY))(shape)
+    if numpy_available:
+        BENCHMARKS["table/decode_columnar/%s" % shape] = (lambda shape: lambda: decode_table(shape, FastSerializer.TABLE_COLUMNAR))(shape)
+    BENCHMARKS["table/encode/%s" % shape] = (lambda shape: lambda: encode_table(shape))(shape)
+
+# invocations of a stand-in server on this host
+
+SERVER = None
+
+def server():
+    global SERVER
+    if SERVER is None:
+        SERVER = MockServer()
+        SERVER.add_procedure("Narrow", [SHAPES["narrow"]()])
+        SERVER.add_procedure("Empty")
+        SERVER.run_in_thread()
+    return SERVER
+
+def procedure(name):
+    host, port = server().host, server().port
+    fser = FastSerializer(host, port)
+    return fser, VoltProcedure(fser, name, [FastSerializer.VOLTTYPE_BIGINT, FastSerializer.VOLTTYPE_STRING])
+
+@benchmark("call/empty")
+def call_empty():
+    fser, proc = procedure("Empty")
+    size = len(serialized(lambda fser: proc.writeInvocation(fser, [1, "x"], 1)))
+    return (lambda: proc.call([1, "x"])), 1, size + len(server().response(1, 1, None, []))
+
+@benchmark("call/narrow")
+def call_narrow():
+    fser, proc = procedure("Narrow")
+    size = len(serialized(lambda fser: proc.writeInvocation(fser, [1, "x"], 1)))
+    return (lambda: proc.call([1, "x"])), 1, size + len(server().response(1, 1, None, [SHAPES["narrow"]()]))
+
+@benchmark("call/pipelined_empty")
+def call_pipelined():
+    fser, proc = procedure("Empty")
+    fser.start_reader()
+    params = [[i, "x"] for i in range(1000)]
+    size = len(serialized(lambda fser: proc.writeInvocation(fser, [1, "x"], 1)))
+    def run():
+        for future in fser.invoke_many(proc, params):
+            future.result()
+    return run, len(params), len(params) * (size + len(server().response(1, 1, None, [])))
+
+def measure(setup, min_time, rounds):
+    """Returns the best time of an operation over rounds rounds, each
+    repeating it for at least min_time seconds, and the number of
+    operations measured.
+    """
+
+    run, items, size = setup()
+    run()
+    # operations per round, at least min_time long
+    count = 1
+    while True:
+        start = time.perf_counter()
+        for i in range(count):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        count = max(count * 2, int(count * min_time / max(elapsed, 1e-9)) + 1)
+    best = elapsed / count
+    for r in range(rounds - 1):
+        start = time.perf_counter()
+        for i in range(count):
+            run()
+        best = min(best, (time.perf_counter() - start) / count)
+    return {"seconds_per_op": best,
+            "ops_per_sec": 1 / best,
+            "items_per_sec": items / best,
+            "bytes_per_sec": size / best,
+            "items": items,
+            "bytes": size,
+            "count": count * rounds}
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output = True,
+                                text = True, cwd = sys.path[0] or ".").stdout.strip()
+    except OSError:
+        commit = ""
+    info = {"python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "commit": commit,
+            "time": datetime.datetime.now().isoformat(timespec = "seconds")}
+    if numpy_available:
+        import numpy
+        info["numpy"] = numpy.__version__
+    return info
+
+def main():
+    parser = argparse.ArgumentParser(description = "Run microbenchmarks of the VoltDB Python client.")
+    parser.add_argument("patterns", nargs = "*", help = "run the benchmarks whose name contains one of them (default: all)")
+    parser.add_argument("--list", action = "store_true", help = "list the benchmarks")
+    parser.add_argument("--min-time", type = float, default = 0.2, help = "seconds each round lasts at least (default: 0.2)")
+    parser.add_argument("--rounds", type = int, default = 5, help = "rounds of each benchmark, the best is reported (default: 5)")
+    parser.add_argument("--json", metavar = "FILE", help = "save the results to FILE")
+    parser.add_argument("--compare", metavar = "FILE", help = "compare with the results saved in FILE")
+    options = parser.parse_args()
+
+    names = [name for name in BENCHMARKS
+             if not options.patterns or any(pattern in name for pattern in options.patterns)]
+    if options.list:
+        print("\n".join(names))
+        return 0
+    baseline = {}
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    print("%-36s %14s %14s %12s %s" % ("benchmark", "ops/sec", "items/sec", "MB/sec", "vs baseline" if baseline else ""))
+    try:
+        for name in names:
+            result = results[name] = measure(BENCHMARKS[name], options.min_time, options.rounds)
+            ratio = ""
+            if name in baseline:
+                ratio = "%.2fx" % (result["ops_per_sec"] / baseline[name]["ops_per_sec"])
+            print("%-36s %14.1f %14.1f %12.2f %s" % (name, result["ops_per_sec"], result["items_per_sec"],
+                                                    result["bytes_per_sec"] / 1e6, ratio))
+            sys.stdout.flush()
+    finally:
+        if SERVER is not None:
+            SERVER.stop()
+
+    if options.json:
+        with open(options.json, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent = 2, sort_keys = True)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
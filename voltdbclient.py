@@ -24,18 +24,28 @@ if sys.hexversion < 0x03060000:
     raise Exception("Python version 3.6 or greater is required (3.9+ is preferred).")
 
 import array
+import asyncio
 import atexit
+import bisect
+import collections
+import functools
+import itertools
 import socket
+import threading
 import base64, textwrap
 import struct
 import datetime
 import decimal
 import hashlib
+import json
 import re
 import math
+import operator
 import os
+import random
 import stat
 import time
+from concurrent import futures
 
 try:
     import ssl
@@ -58,6 +68,13 @@ except ImportError as e:
     pkcs12_available = False
     pkcs12_exception = e
 
+try:
+    import numpy
+    numpy_available = True
+except ImportError as e:
+    numpy_available = False
+    numpy_exception = e
+
 try:
     import gssapi
     kerberos_available = True
@@ -65,6 +82,13 @@ except ImportError as e:
     kerberos_available = False
     kerberos_exception = e
 
+try:
+    from opentelemetry import trace as otel_trace
+    opentelemetry_available = True
+except ImportError as e:
+    opentelemetry_available = False
+    opentelemetry_exception = e
+
 logger = None
 
 def use_logging():
@@ -111,14 +135,82 @@ def isNaN(d):
 class ReadBuffer(object):
     """
     Read buffer management class.
+
+    Messages are received straight into a bytearray which is reused from
+    one message to the next, and are read through a memoryview of it, so
+    views returned by get_buffer(), read() and take() are only valid until
+    the next message is received.
     """
+
+    # size above which the receive buffer is not kept once a smaller
+    # message arrives
+    RETAIN_LIMIT = 4 * 1024 * 1024
+
     def __init__(self):
+        self._storage = bytearray()
+        # while a message is streamed, called with the number of bytes
+        # missing to receive more of it, see FastSerializer.bufferForStreaming()
+        self.source = None
         self.clear()
 
     def clear(self):
-        self._buf = bytes()
+        self._buf = memoryview(self._storage)[:0]
+        self._off = 0
+
+    def reserve(self, size):
+        """Prepares the buffer for a message of size bytes, and returns a
+        writable view of exactly that size to receive it into.
+        """
+
+        capacity = len(self._storage)
+        if size > capacity:
+            self._storage = bytearray(max(size, 2 * capacity))
+        elif capacity > self.RETAIN_LIMIT and size <= self.RETAIN_LIMIT:
+            self._storage = bytearray(size)
+        self._buf = memoryview(self._storage)[:size]
+        self._off = 0
+        return self._buf
+
+    def extend(self, size):
+        """Drops the bytes already read, and returns a writable view of size
+        bytes following the unread ones to receive more of the message into.
+        """
+
+        unread = self._buf[self._off:]
+        length = len(unread)
+        if length + size > len(self._storage) or self._buf.obj is not self._storage:
+            storage = bytearray(max(length + size, 2 * len(self._storage)))
+            storage[:length] = unread
+            self._storage = storage
+        elif length > 0 and self._off > 0:
+            self._storage[:length] = bytes(unread)
+        self._buf = memoryview(self._storage)[:length + size]
+        self._off = 0
+        return self._buf[length:]
+
+    def __fill(self, size):
+        # asks the source for more of a message being streamed, so that size
+        # bytes are available
+        missing = size - self.remaining()
+        return missing > 0 and self.source is not None and self.source(missing)
+
+    def wrap(self, content):
+        """Makes content, a complete message received by other means, the
+        buffer, without copying it.
+        """
+
+        self._buf = memoryview(content)
         self._off = 0
 
+    def detach(self):
+        """Hands the current message over to the caller, who may keep views
+        of it: the next message is received into a new bytearray.
+        """
+
+        if self._buf.obj is self._storage:
+            self._storage = bytearray()
+        return self._buf
+
     def buffer_length(self):
         return len(self._buf)
 
@@ -129,23 +221,178 @@ class ReadBuffer(object):
         return self._buf
 
     def append(self, content):
-        self._buf += content
+        length = len(self._buf)
+        if length + len(content) > len(self._storage) or self._buf.obj is not self._storage:
+            storage = bytearray(max(length + len(content), 2 * len(self._storage)))
+            storage[:length] = self._buf
+            self._storage = storage
+        self._storage[length:length + len(content)] = content
+        self._buf = memoryview(self._storage)[:length + len(content)]
 
     def shift(self, size):
         self._off += size
 
     def read(self, size):
+        if self._off + size > len(self._buf):
+            self.__fill(size)
         return self._buf[self._off:self._off+size]
 
+    def take(self, size):
+        """Returns a view of the next size bytes and moves past them."""
+
+        end = self._off + size
+        if size < 0 or end > len(self._buf):
+            if size > 0 and self.__fill(size):
+                return self.take(size)
+            message = 'Exception taking %d bytes with %d remaining' % (size, self.remaining())
+            error(message)
+            raise struct.error(message)
+        view = self._buf[self._off:end]
+        self._off = end
+        return view
+
     def unpack(self, format, size):
         try:
             values = struct.unpack_from(format, self._buf, self._off)
         except struct.error as e:
+            if self.__fill(size):
+                return self.unpack(format, size)
             error('Exception unpacking %d bytes using format "%s": %s' % (size, format, str(e)))
             raise e
         self.shift(size)
         return values
 
+    def unpack_struct(self, packer):
+        """As unpack(), with a precompiled struct.Struct."""
+
+        try:
+            values = packer.unpack_from(self._buf, self._off)
+        except struct.error as e:
+            if self.__fill(packer.size):
+                return self.unpack_struct(packer)
+            error('Exception unpacking %d bytes using format "%s": %s' % (packer.size, packer.format, str(e)))
+            raise e
+        self._off += packer.size
+        return values
+
+class WriteBuffer(object):
+    """
+    Write buffer management class.
+
+    Messages are serialized into a bytearray which is reused from one
+    message to the next. The first four bytes of each message are reserved
+    for its length, which prepend_length() fills in place once the message
+    is complete. Several messages can be written back to back before the
+    buffer is sent.
+    """
+
+    INITIAL_SIZE = 256
+    # size above which the buffer is not kept after it has been sent
+    RETAIN_LIMIT = 4 * 1024 * 1024
+
+    LENGTH = struct.Struct('>i')
+
+    def __init__(self):
+        self._buf = bytearray(self.INITIAL_SIZE)
+        self.clear()
+
+    def clear(self):
+        if len(self._buf) > self.RETAIN_LIMIT:
+            self._buf = bytearray(self.INITIAL_SIZE)
+        self._start = 0      # offset of the length of the message being written
+        self._pos = 4        # end of the data written
+        self._framed = False # whether any message has been completed
+        self.traced = None   # (handle, procedure name) of the traced invocations written
+
+    def ensure(self, size):
+        """Makes room for size more bytes."""
+
+        needed = self._pos + size
+        if needed > len(self._buf):
+            self._buf.extend(bytes(max(needed, 2 * len(self._buf)) - len(self._buf)))
+
+    def append(self, value):
+        self.ensure(1)
+        self._buf[self._pos] = value
+        self._pos += 1
+
+    def extend(self, content):
+        try:
+            size = memoryview(content).nbytes
+        except TypeError: # list of byte values
+            content = bytes(content)
+            size = len(content)
+        self.ensure(size)
+        self._buf[self._pos:self._pos + size] = content
+        self._pos += size
+
+    def tell(self):
+        """Returns the position of the end of the data written."""
+
+        return self._pos
+
+    def pack_at(self, packer, position, *values):
+        """Packs values with packer, a struct.Struct, over what was written
+        at position, as returned by tell(), e.g. to fill in a size.
+        """
+
+        packer.pack_into(self._buf, position, *values)
+
+    def truncate(self, position):
+        """Drops what was written after position, as returned by tell(),
+        in the message being written.
+        """
+
+        self._pos = position
+
+    def pack_into(self, packer, *values):
+        """Appends values packed by packer, a struct.Struct."""
+
+        self.ensure(packer.size)
+        packer.pack_into(self._buf, self._pos, *values)
+        self._pos += packer.size
+
+    def prepend_length(self):
+        """Completes the message being written by filling in its length,
+        NOT including the length itself, and reserves room for the length
+        of the next message.
+        """
+
+        self.LENGTH.pack_into(self._buf, self._start, self._pos - self._start - 4)
+        self._framed = True
+        self.ensure(4)
+        self._start = self._pos
+        self._pos += 4
+
+    def __spans(self):
+        # (begin, end) of the content: completed messages, including their
+        # lengths, and then anything written since
+        spans = []
+        if self._framed:
+            spans.append((0, self._start))
+        if self._pos > self._start + 4:
+            spans.append((self._start + 4, self._pos))
+        return spans
+
+    def size(self):
+        return sum(end - begin for begin, end in self.__spans())
+
+    def getvalue(self):
+        """Returns a copy of the content as bytes."""
+
+        return b''.join(bytes(self._buf[begin:end]) for begin, end in self.__spans())
+
+    def send(self, sock):
+        """Sends the content on sock without copying it."""
+
+        with memoryview(self._buf) as view:
+            for begin, end in self.__spans():
+                with view[begin:end] as span:
+                    sock.sendall(span)
+
+    def __repr__(self):
+        return 'WriteBuffer(%r)' % self.getvalue()
+
 unique_tag = '%x' % int(time.time() * 1000000)
 scratch_dir = None
 temporary_files = []
@@ -161,6 +408,503 @@ def remove_temporary_files():
 
 atexit.register(remove_temporary_files)
 
+# TLS contexts built by FastSerializer.ssl_context(), with the ssl_config
+# they were built from, by configuration; and the last TLS session of each
+# server, by configuration and server address.
+ssl_contexts = {}
+ssl_sessions = {}
+ssl_cache_lock = threading.Lock()
+
+class RetryPolicy:
+    """When a FastSerializer or VoltClient loses its connection, how it
+    reconnects and which calls are sent again.
+
+    Reconnection is attempted up to retries times, each attempt after a
+    random delay of up to backoff * 2 ** attempt seconds, at most
+    max_backoff ("full jitter", so that clients losing a server together do
+    not reconnect together). VoltProcedure.call() then sends again, up to
+    retries times, the calls whose connection was lost before the response
+    arrived, if repeating them is harmless: calls of the procedures named in
+    procedures, and with read_only those known not to modify data.
+    """
+
+    # system procedures which do not modify data
+    READ_ONLY_PROCEDURES = frozenset(["@Statistics", "@SystemCatalog", "@SystemInformation",
+                                      "@Explain", "@ExplainProc", "@ExplainView", "@Ping",
+                                      "@GetPartitionKeys"])
+
+    def __init__(self, retries = 3, backoff = 0.1, max_backoff = 10.0, procedures = (), read_only = True):
+        """
+        :param retries: reconnection attempts, and times a call is sent again
+        :param backoff: upper bound of the first delay (secs)
+        :param max_backoff: upper bound of the delays (secs)
+        :param procedures: names of the procedures which can be called again
+        :param read_only: also call again the procedures known not to modify data
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.procedures = frozenset(procedures)
+        self.read_only = read_only
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def retryable(self, fser, name):
+        return name in self.procedures or (self.read_only and fser.is_read_only(name))
+
+class LatencyHistogram:
+    """Histogram of latencies in microseconds, with log-linear buckets as in
+    HdrHistogram: values below 2 ** SUB_BUCKET_BITS have their own bucket,
+    larger ones are rounded down to SUB_BUCKET_BITS - 1 significant bits
+    (a relative error below 1%). Recording a value is a few integer
+    operations; percentiles are computed from the buckets.
+    """
+
+    SUB_BUCKET_BITS = 8
+    # longest latency recorded as itself, 2 ** 37 us (38 hours)
+    BUCKET_COUNT = (37 - SUB_BUCKET_BITS + 2) << (SUB_BUCKET_BITS - 1)
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def bucket(cls, value):
+        shift = max(0, value.bit_length() - cls.SUB_BUCKET_BITS)
+        return min((shift << (cls.SUB_BUCKET_BITS - 1)) + (value >> shift), cls.BUCKET_COUNT - 1)
+
+    @classmethod
+    def bucket_value(cls, index):
+        "the smallest value of the bucket index"
+        if index < 1 << cls.SUB_BUCKET_BITS:
+            return index
+        shift = (index >> (cls.SUB_BUCKET_BITS - 1)) - 1
+        return (index - (shift << (cls.SUB_BUCKET_BITS - 1))) << shift
+
+    def record(self, value):
+        value = max(0, int(value))
+        self.counts[self.bucket(value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        """Returns the value below which percent % of the values are, as the
+        smallest value of its bucket, or None if nothing was recorded.
+        """
+
+        if self.count == 0:
+            return None
+        rank = max(1, math.ceil(self.count * percent / 100.0))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(max(self.bucket_value(index), self.min), self.max)
+        return self.max
+
+    def copy(self):
+        histogram = LatencyHistogram()
+        histogram.counts = list(self.counts)
+        histogram.count = self.count
+        histogram.total = self.total
+        histogram.min = self.min
+        histogram.max = self.max
+        return histogram
+
+    def minus(self, earlier):
+        """Returns the histogram of the values recorded since earlier, a copy
+        of this histogram. Its min and max are those of their buckets.
+        """
+
+        histogram = LatencyHistogram()
+        histogram.counts = [a - b for a, b in zip(self.counts, earlier.counts)]
+        histogram.count = self.count - earlier.count
+        histogram.total = self.total - earlier.total
+        used = [i for i, count in enumerate(histogram.counts) if count]
+        if used:
+            histogram.min = max(self.bucket_value(used[0]), self.min)
+            histogram.max = min(self.bucket_value(used[-1] + 1) - 1, self.max)
+        return histogram
+
+    def summary(self):
+        """Returns the count, and the min, mean, max, p50, p99 and p99.9
+        latencies in milliseconds, as a dict.
+        """
+
+        ms = lambda value: None if value is None else value / 1000.0
+        return {"count": self.count,
+                "min": ms(self.min),
+                "mean": ms(self.total / self.count if self.count else None),
+                "max": ms(self.max),
+                "p50": ms(self.percentile(50)),
+                "p99": ms(self.percentile(99)),
+                "p99.9": ms(self.percentile(99.9))}
+
+class ProcedureStats:
+    "counters and latency histograms of the invocations of one procedure"
+
+    __slots__ = ('calls', 'errors', 'timeouts', 'bytes_out', 'bytes_in', 'latency', 'server_latency')
+
+    def __init__(self):
+        self.calls = 0          # invocations completed, failed or timed out
+        self.errors = 0         # responses whose status is not success
+        self.timeouts = 0       # invocations given up on
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.latency = LatencyHistogram()         # measured by the client
+        self.server_latency = LatencyHistogram()  # roundtripTime reported by the server
+
+    def copy(self):
+        stats = ProcedureStats()
+        for name in ('calls', 'errors', 'timeouts', 'bytes_out', 'bytes_in'):
+            setattr(stats, name, getattr(self, name))
+        stats.latency = self.latency.copy()
+        stats.server_latency = self.server_latency.copy()
+        return stats
+
+    def minus(self, earlier):
+        stats = ProcedureStats()
+        for name in ('calls', 'errors', 'timeouts', 'bytes_out', 'bytes_in'):
+            setattr(stats, name, getattr(self, name) - getattr(earlier, name))
+        stats.latency = self.latency.minus(earlier.latency)
+        stats.server_latency = self.server_latency.minus(earlier.server_latency)
+        return stats
+
+    def summary(self):
+        return {"calls": self.calls,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "bytes_out": self.bytes_out,
+                "bytes_in": self.bytes_in,
+                "latency": self.latency.summary(),
+                "server_latency": self.server_latency.summary()}
+
+class ClientStats:
+    """Per-procedure statistics of the invocations sent on the connections
+    it is given to, as the stats keyword argument of FastSerializer,
+    AsyncFastSerializer or VoltClient. One ClientStats can be shared by
+    several connections and threads.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.procedures = {}  # procedure name -> ProcedureStats
+        self.__last = {}      # procedures at the last delta()
+        self.__reporting = None
+
+    def __procedure(self, name):
+        stats = self.procedures.get(name)
+        if stats is None:
+            stats = self.procedures[name] = ProcedureStats()
+        return stats
+
+    def record(self, name, elapsed, response, sent, received):
+        """Records the response to an invocation of the procedure name,
+        elapsed seconds after it was sent, with the sizes of the invocation
+        and response messages.
+        """
+
+        with self.lock:
+            stats = self.__procedure(name)
+            stats.calls += 1
+            stats.bytes_out += sent
+            stats.bytes_in += received
+            if response.status != 1:
+                stats.errors += 1
+            if response.roundtripTime >= 0:
+                # received from the server
+                stats.latency.record(elapsed * 1000000)
+                stats.server_latency.record(response.roundtripTime * 1000)
+
+    def record_timeout(self, name, sent):
+        with self.lock:
+            stats = self.__procedure(name)
+            stats.calls += 1
+            stats.timeouts += 1
+            stats.bytes_out += sent
+
+    def snapshot(self):
+        """Returns the statistics since the beginning, as a dict of
+        ProcedureStats.summary() dicts by procedure name.
+        """
+
+        with self.lock:
+            return dict((name, stats.summary()) for name, stats in self.procedures.items())
+
+    def delta(self):
+        """As snapshot(), for the invocations since the last call of
+        delta().
+        """
+
+        with self.lock:
+            current = dict((name, stats.copy()) for name, stats in self.procedures.items())
+        last, self.__last = self.__last, current
+        return dict((name, (stats.minus(last[name]) if name in last else stats).summary())
+                    for name, stats in current.items())
+
+    def start_reporting(self, interval, callback):
+        """Calls callback with delta() every interval seconds, from a
+        background thread, until stop_reporting() is called.
+        """
+
+        self.stop_reporting()
+        stopped = threading.Event()
+        def report():
+            while not stopped.wait(interval):
+                try:
+                    callback(self.delta())
+                except Exception as e:
+                    error("ERROR: exception in statistics callback: %s" % e)
+        thread = threading.Thread(target=report, name="voltdbclient-stats")
+        thread.daemon = True
+        self.__reporting = (stopped, thread)
+        thread.start()
+
+    def stop_reporting(self):
+        if self.__reporting is not None:
+            stopped, thread = self.__reporting
+            self.__reporting = None
+            stopped.set()
+            if thread is not threading.current_thread():
+                thread.join()
+
+class CallTracer:
+    """Receives the phases of the invocations sent on the connections it is
+    given to, as the tracer keyword argument of FastSerializer,
+    AsyncFastSerializer or VoltClient. Subclasses override phase() and
+    finished(), which are called from the threads sending the invocations
+    and reading the responses. Times are time.perf_counter_ns() values.
+    """
+
+    SERIALIZE = "serialize"  # the invocation is written to the write buffer
+    SEND = "send"            # the write buffer is sent
+    WAIT = "wait"            # until the whole response (or its header when streamed) is received
+    DECODE = "decode"        # the response is decoded
+
+    def phase(self, fser, procedure, handle, phase, start, end):
+        """Called at the end of each phase of the invocation with client
+        handle handle of the procedure named procedure on the connection
+        fser.
+        """
+
+        pass
+
+    def finished(self, fser, procedure, handle, response):
+        """Called after the last phase of the invocation, with its
+        VoltResponse, or None if it timed out.
+        """
+
+        pass
+
+class OpenTelemetryTracer(CallTracer):
+    """CallTracer which makes an OpenTelemetry span per invocation, with a
+    child span per phase, from an opentelemetry.trace.Tracer, by default
+    the one of the global tracer provider. The span of an invocation is a
+    child of the span current when the invocation is written.
+    """
+
+    def __init__(self, tracer = None):
+        if not opentelemetry_available:
+            error("To make OpenTelemetry spans please install the 'opentelemetry-api' module.")
+            raise opentelemetry_exception
+        self.tracer = tracer or otel_trace.get_tracer("voltdbclient")
+        # OpenTelemetry times are nanoseconds since the epoch
+        self.offset = time.time_ns() - time.perf_counter_ns()
+        self.lock = threading.Lock()
+        self.spans = {}  # (connection, client handle) -> span of the invocation
+
+    def phase(self, fser, procedure, handle, phase, start, end):
+        key = (id(fser), handle)
+        if phase == self.SERIALIZE:
+            span = self.tracer.start_span(procedure, kind = otel_trace.SpanKind.CLIENT,
+                                          start_time = start + self.offset,
+                                          attributes = {"db.system": "voltdb",
+                                                        "db.operation": procedure,
+                                                        "net.peer.name": str(fser.host),
+                                                        "net.peer.port": fser.port or 0,
+                                                        "voltdb.client_handle": handle})
+            with self.lock:
+                self.spans[key] = span
+        else:
+            with self.lock:
+                span = self.spans.get(key)
+            if span is None:
+                return
+        context = otel_trace.set_span_in_context(span)
+        self.tracer.start_span(phase, context = context,
+                               start_time = start + self.offset).end(end_time = end + self.offset)
+
+    def finished(self, fser, procedure, handle, response):
+        with self.lock:
+            span = self.spans.pop((id(fser), handle), None)
+        if span is None:
+            return
+        if response is None:
+            span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, "timeout"))
+        else:
+            span.set_attribute("voltdb.status", response.status)
+            if response.status != 1:
+                span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, response.statusString or ""))
+        span.end(end_time = time.perf_counter_ns() + self.offset)
+
+class CaptureWriter:
+    """Records the messages sent and received on a connection in a capture
+    file, for the dump_file_path keyword argument of FastSerializer and
+    AsyncFastSerializer. The messages are only copied and queued where
+    they are sent or received; a background thread frames them and writes
+    them out in large writes.
+
+    A capture file starts with MAGIC, followed by records made of a HEADER
+    and the bytes of a message, including its length prefix:
+        flags: SENT or RECEIVED, with LOGIN for the messages of the login
+               handshake, or CONTINUED for the rest of a message received
+               in chunks (see FastSerializer.bufferForStreaming())
+        time:  nanoseconds since the epoch when it was sent or received
+        handle: client handle of the invocation or response, or -1
+        size:  number of bytes which follow
+    """
+
+    MAGIC = b"VOLTCAP1"
+    HEADER = struct.Struct(">BqqI")  # flags, time, client handle, size
+    INT32 = struct.Struct(">i")
+    INT64 = struct.Struct(">q")
+
+    SENT = 1
+    RECEIVED = 2
+    LOGIN = 4
+    CONTINUED = 8
+
+    BUFFER_SIZE = 1024 * 1024  # bytes of records written at once
+    INTERVAL = 0.1             # seconds between writes
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(self.MAGIC)
+        self.login = False   # whether the messages are part of the login handshake
+        self.queue = collections.deque()  # (flags, time, list of bytes) to write
+        self.closed = threading.Event()
+        self.writer = threading.Thread(target=self.__write, name="voltdbclient-capture")
+        self.writer.daemon = True
+        self.writer.start()
+
+    def sent(self, data):
+        "Records data, one or more messages, as sent."
+
+        self.queue.append((self.SENT | (self.LOGIN if self.login else 0), time.time_ns(), [bytes(data)]))
+
+    def received(self, *parts):
+        "Records the concatenation of parts, a message, as received."
+
+        self.queue.append((self.RECEIVED | (self.LOGIN if self.login else 0), time.time_ns(),
+                           [bytes(part) for part in parts]))
+
+    def continued(self, data):
+        "Records data as the next chunk of the message received last."
+
+        self.queue.append((self.RECEIVED | self.CONTINUED, time.time_ns(), [bytes(data)]))
+
+    def close(self):
+        "Writes out what is queued and closes the file."
+
+        if not self.closed.is_set():
+            self.closed.set()
+            self.writer.join()
+            self.file.close()
+
+    def __write(self):
+        buffer = bytearray()
+        while not self.closed.wait(self.INTERVAL):
+            self.__drain(buffer)
+            self.file.flush()
+        self.__drain(buffer)
+        self.file.write(buffer)
+
+    def __drain(self, buffer):
+        queue = self.queue
+        while queue:
+            flags, timestamp, parts = queue.popleft()
+            data = b"".join(parts) if len(parts) > 1 else parts[0]
+            if flags & (self.CONTINUED | self.LOGIN):
+                buffer += self.HEADER.pack(flags, timestamp, -1, len(data))
+                buffer += data
+            elif flags & self.SENT:
+                # a write may hold several invocations, one record each
+                offset = 0
+                while offset + 4 <= len(data):
+                    end = offset + 4 + self.INT32.unpack_from(data, offset)[0]
+                    buffer += self.HEADER.pack(flags, timestamp, self.invocation_handle(data, offset), end - offset)
+                    buffer += data[offset:end]
+                    offset = end
+            else:
+                buffer += self.HEADER.pack(flags, timestamp, self.response_handle(data, 0), len(data))
+                buffer += data
+            if len(buffer) >= self.BUFFER_SIZE:
+                self.file.write(buffer)
+                del buffer[:]
+        self.file.write(buffer)
+        del buffer[:]
+
+    @classmethod
+    def invocation_handle(cls, data, offset):
+        "client handle of the invocation whose length prefix is at offset in data"
+
+        try:
+            name_length = cls.INT32.unpack_from(data, offset + 5)[0]
+            return cls.INT64.unpack_from(data, offset + 9 + max(name_length, 0))[0]
+        except struct.error:
+            return -1
+
+    @classmethod
+    def response_handle(cls, data, offset):
+        "client handle of the response whose length prefix is at offset in data"
+
+        try:
+            return cls.INT64.unpack_from(data, offset + 5)[0]
+        except struct.error:
+            return -1
+
+CaptureRecord = collections.namedtuple("CaptureRecord", ["flags", "time", "handle", "data"])
+
+def read_capture(path):
+    """Yields the records of the capture file at path, written by
+    CaptureWriter, as CaptureRecord tuples. The chunks of a message received
+    in chunks are joined into one record.
+    """
+
+    header = CaptureWriter.HEADER
+    with open(path, "rb") as f:
+        if f.read(len(CaptureWriter.MAGIC)) != CaptureWriter.MAGIC:
+            raise ValueError("%s is not a capture file" % path)
+        last = None
+        chunks = []  # the data of last, joined once it is complete
+        while True:
+            fields = f.read(header.size)
+            if len(fields) < header.size:
+                break
+            flags, timestamp, handle, size = header.unpack(fields)
+            data = f.read(size)
+            if len(data) < size:
+                break
+            if flags & CaptureWriter.CONTINUED and last is not None:
+                chunks.append(data)
+                continue
+            if last is not None:
+                yield last._replace(data = b"".join(chunks))
+            last = CaptureRecord(flags, timestamp, handle, None)
+            chunks = [data]
+        if last is not None:
+            yield last._replace(data = b"".join(chunks))
+
 class FastSerializer:
     "Primitive type de/serialization in VoltDB formats"
 
@@ -185,6 +929,16 @@ class FastSerializer:
     VOLTTYPE_GEOGRAPHY_POINT = 26
     VOLTTYPE_GEOGRAPHY = 27
 
+    # Precompiled structs for single values of the fixed width types, for
+    # each byte order
+    STRUCTS = dict((bom, {'byte': struct.Struct(bom + 'b'),
+                          'int16': struct.Struct(bom + 'h'),
+                          'int32': struct.Struct(bom + 'i'),
+                          'int64': struct.Struct(bom + 'q'),
+                          'float64': struct.Struct(bom + 'd'),
+                          'point': struct.Struct(bom + '2d')})
+                   for bom in (LITTLE_ENDIAN, BIG_ENDIAN))
+
     # SQL NULL indicator for object type serializations (string, decimal)
     NULL_STRING_INDICATOR = -1
     NULL_DECIMAL_INDICATOR = -170141183460469231731687303715884105728
@@ -196,6 +950,35 @@ class FastSerializer:
 
     # default decimal scale
     DEFAULT_DECIMAL_SCALE = 12
+    # exact for any 128-bit unscaled value
+    DECIMAL_CONTEXT = decimal.Context(prec = 39)
+
+    # how tables in responses are decoded, see VoltTable
+    TABLE_ROWS = "rows"
+    TABLE_COLUMNAR = "columnar"
+    TABLE_LAZY = "lazy"
+
+    # type of the rows of tables, see VoltTable
+    ROW_LIST = "list"
+    ROW_TUPLE = "tuple"
+    ROW_NAMEDTUPLE = "namedtuple"
+
+    # how TIMESTAMP values are decoded, see dateFromMicroseconds
+    TIMESTAMP_LOCAL = "local"
+    TIMESTAMP_UTC = "utc"
+    TIMESTAMP_RAW = "raw"
+    TIMESTAMP_DATETIME64 = "datetime64"
+
+    EPOCH_UTC = datetime.datetime(1970, 1, 1, tzinfo = datetime.timezone.utc)
+    # timestamps closer to the epoch than this many microseconds (years 1827
+    # to 2112) convert exactly through a float number of seconds
+    FLOAT_EXACT_MICROSECONDS = 1 << 52
+
+    # size of the reads of a streamed message
+    STREAM_CHUNK = 64 * 1024
+
+    # size of the invocations of a batch written before they are sent
+    BATCH_FLUSH_SIZE = 256 * 1024
 
     # protocol constants
     AUTH_HANDSHAKE_VERSION = 2
@@ -234,7 +1017,13 @@ class FastSerializer:
                  procedure_timeout = None,
                  default_timeout = None,
                  ssl_config_file = None,
-                 default_cacerts = True):
+                 default_cacerts = True,
+                 table_mode = None,
+                 row_type = None,
+                 timestamp_mode = None,
+                 retry_policy = None,
+                 stats = None,
+                 tracer = None):
         """
         :param host: host string for connection or None
         :param port: port for connection or None
@@ -242,15 +1031,22 @@ class FastSerializer:
         :param username: authentication user name for connection or None
         :param password: authentication password for connection or None
         :param kerberos: use Kerberos authentication
-        :param dump_file_path: path to optional dump file or None
+        :param dump_file_path: path of a capture file of the messages sent and received (see CaptureWriter) or None
         :param connect_timeout: timeout (secs) or None for authentication (default=8)
         :param procedure_timeout: timeout (secs) or None for procedure calls (default=None)
         :param default_timeout: default timeout (secs) or None for all other operations (default=None)
         :param ssl_config_file: config file that defines java keystore and truststore files
         :param default_cacerts: if true, use installation default cacerts when truststore unspecified
+        :param table_mode: how tables are decoded, TABLE_ROWS (default), TABLE_COLUMNAR or TABLE_LAZY
+        :param row_type: type of the rows of tables, ROW_LIST (default), ROW_TUPLE or ROW_NAMEDTUPLE
+        :param timestamp_mode: how timestamps are decoded, TIMESTAMP_LOCAL (default), TIMESTAMP_UTC,
+                               TIMESTAMP_RAW or TIMESTAMP_DATETIME64
+        :param retry_policy: RetryPolicy for reconnecting and retrying calls when the connection is lost, or None
+        :param stats: ClientStats in which to record the invocations, or None
+        :param tracer: CallTracer to which the phases of the invocations are reported, or None
         """
         # connect a socket to host, port and get a file object
-        self.wbuf = array.array('B')
+        self.wbuf = WriteBuffer()
         self.host = host
         self.port = port
         self.usessl = usessl
@@ -259,38 +1055,57 @@ class FastSerializer:
         else:
             self.usekerberos = kerberos
         self.kerberosprincipal = None
-        self.ssl_config = self.DEFAULT_SSL_CONFIG
+        self.ssl_config = dict(self.DEFAULT_SSL_CONFIG)
+        self.ssl_context_key = None
         self.ssl_config_file = ssl_config_file
         self.default_cacerts = default_cacerts and usessl
         if not dump_file_path is None:
-            self.dump_file = open(dump_file_path, "wb")
+            self.capture = CaptureWriter(dump_file_path)
         else:
-            self.dump_file = None
+            self.capture = None
         self.default_timeout = default_timeout
         self.procedure_timeout = procedure_timeout
-
+        self.table_mode = table_mode or self.TABLE_ROWS
+        if self.table_mode == self.TABLE_COLUMNAR and not numpy_available:
+            error("To decode tables by column please install the 'numpy' module.")
+            raise numpy_exception
+        self.row_type = row_type or self.ROW_LIST
+        self.timestamp_mode = timestamp_mode or self.TIMESTAMP_LOCAL
+        if self.timestamp_mode == self.TIMESTAMP_DATETIME64 and not numpy_available:
+            error("To decode timestamps as datetime64 please install the 'numpy' module.")
+            raise numpy_exception
+        self.__dateFromMicroseconds = {self.TIMESTAMP_LOCAL: self.__localDate,
+                                       self.TIMESTAMP_UTC: self.__utcDate,
+                                       self.TIMESTAMP_RAW: self.__rawDate,
+                                       self.TIMESTAMP_DATETIME64: self.__datetime64}[self.timestamp_mode]
+
+        # pipelined invocation state, see invoke()
+        self.handles = itertools.count(1)
+        self.pending = {}
+        self.reader = None
+        self.reader_failure = None
+        self.lock = threading.RLock()
+
+        # per-procedure statistics and tracing, see record_invocation()
+        self.stats = stats
+        self.timings = {}  # client handle -> (procedure name, start time, bytes sent)
+        self.tracer = tracer
+        # client handle -> [procedure name, send start, send end], the send
+        # end is None until the sender or the reader sets it
+        self.traces = {}
+        self.trace_lock = threading.Lock()
+
+        # kept for reconnect()
+        self.username = username
+        self.password = password
+        self.connect_timeout = connect_timeout
+        self.retry_policy = retry_policy
+        self.recovery_lock = threading.Lock()
+
+        self.host_id = None
         self.socket = None
         if self.host != None and self.port != None:
-            ai = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM, socket.IPPROTO_TCP, socket.AI_ADDRCONFIG)[0]
-            # ai = (family, socktype, proto, canonname, sockaddr)
-            ss = socket.socket(ai[0], ai[1], ai[2])
-            if self.usessl:
-                if ssl_available:
-                    self.socket = self.__wrap_socket(ss)
-                else:
-                    error("ERROR: To use SSL functionality please install the Python ssl module.")
-                    raise ssl_exception
-            else:
-                self.socket = ss
-            self.socket.setblocking(1)
-            self.socket.setsockopt(socket.SOL_TCP, socket.TCP_NODELAY, 1)
-            try:
-                self.socket.connect(ai[4])
-            except Exception:
-                error("ERROR: Failed to connect to %s port %s" % (ai[4][0], ai[4][1]))
-                raise
-            #if self.usessl:
-            #    print('Cipher suite: ' + str(self.socket.cipher()))
+            self.__open_socket()
 
         # input can be big or little endian
         self.inputBOM = self.BIG_ENDIAN  # byte order if input stream
@@ -308,7 +1123,8 @@ class FastSerializer:
                        self.VOLTTYPE_TIMESTAMP: self.readDate,
                        self.VOLTTYPE_DECIMAL: self.readDecimal,
                        self.VOLTTYPE_GEOGRAPHY_POINT: self.readGeographyPoint,
-                       self.VOLTTYPE_GEOGRAPHY: self.readGeography}
+                       self.VOLTTYPE_GEOGRAPHY: self.readGeography,
+                       self.VOLTTYPE_VOLTTABLE: self.readVoltTable}
         self.WRITER = {self.VOLTTYPE_NULL: self.writeNull,
                        self.VOLTTYPE_TINYINT: self.writeByte,
                        self.VOLTTYPE_SMALLINT: self.writeInt16,
@@ -320,7 +1136,8 @@ class FastSerializer:
                        self.VOLTTYPE_TIMESTAMP: self.writeDate,
                        self.VOLTTYPE_DECIMAL: self.writeDecimal,
                        self.VOLTTYPE_GEOGRAPHY_POINT: self.writeGeographyPoint,
-                       self.VOLTTYPE_GEOGRAPHY: self.writeGeography}
+                       self.VOLTTYPE_GEOGRAPHY: self.writeGeography,
+                       self.VOLTTYPE_VOLTTABLE: self.writeVoltTable}
         self.ARRAY_READER = {self.VOLTTYPE_TINYINT: self.readByteArray,
                              self.VOLTTYPE_SMALLINT: self.readInt16Array,
                              self.VOLTTYPE_INTEGER: self.readInt32Array,
@@ -336,7 +1153,7 @@ class FastSerializer:
 
         # Check if the value of a given type is NULL
         self.NULL_DECIMAL_INDICATOR = \
-            self.__intToBytes(self.__class__.NULL_DECIMAL_INDICATOR, 0)
+            self.__class__.NULL_DECIMAL_INDICATOR.to_bytes(16, "big", signed = True)
         self.NullCheck = {self.VOLTTYPE_NULL:
                               lambda x: None,
                           self.VOLTTYPE_TINYINT:
@@ -357,22 +1174,116 @@ class FastSerializer:
                               lambda x: None if x == self.NULL_DECIMAL_INDICATOR else x}
 
         self.read_buffer = ReadBuffer()
-
+        self.responseprefix = bytearray(4)
+        self.stream_remaining = None  # bytes of the streamed message not received yet
+        self.stream_prefix = None     # length of the streamed message, until captured
+
+        self.__login()
+
+    def __open_socket(self):
+        ai = socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_STREAM, socket.IPPROTO_TCP, socket.AI_ADDRCONFIG)[0]
+        # ai = (family, socktype, proto, canonname, sockaddr)
+        ss = socket.socket(ai[0], ai[1], ai[2])
+        if self.usessl:
+            if ssl_available:
+                self.socket = self.__wrap_socket(ss, ai[4])
+            else:
+                error("ERROR: To use SSL functionality please install the Python ssl module.")
+                raise ssl_exception
+        else:
+            self.socket = ss
+        self.socket.setblocking(1)
+        self.socket.setsockopt(socket.SOL_TCP, socket.TCP_NODELAY, 1)
+        try:
+            self.socket.connect(ai[4])
+        except Exception:
+            error("ERROR: Failed to connect to %s port %s" % (ai[4][0], ai[4][1]))
+            raise
+        #if self.usessl:
+        #    print('Cipher suite: ' + str(self.socket.cipher()))
+
+    def __login(self):
+        if self.capture is not None:
+            self.capture.login = True
         if self.usekerberos:
             if not kerberos_available:
                 raise RuntimeError("Requested Kerberos authentication but unable to import the GSSAPI package.")
             if not self.has_ticket():
                 raise RuntimeError("Requested Kerberos authentication but no valid ticket found. Authenticate with Kerberos first.")
             assert not self.socket is None
-            self.socket.settimeout(connect_timeout)
+            self.socket.settimeout(self.connect_timeout)
             self.authenticate(str(self.kerberosprincipal), "")
-        elif not username is None and not password is None and not host is None:
+        elif not self.username is None and not self.password is None and not self.host is None:
             assert not self.socket is None
-            self.socket.settimeout(connect_timeout)
-            self.authenticate(username, password)
+            self.socket.settimeout(self.connect_timeout)
+            self.authenticate(self.username, self.password)
 
         if self.socket:
             self.socket.settimeout(self.default_timeout)
+            if self.usessl:
+                self.__save_ssl_session()
+        if self.capture is not None:
+            self.capture.login = False
+
+    def reconnect(self):
+        """Replaces the connection, e.g. after it was lost, by a new one to
+        the same server, authenticated with the same credentials. If the
+        connection was pipelined, invocations still pending fail and the
+        new connection is pipelined too.
+        """
+
+        reader = self.reader
+        if reader is not None:
+            try:
+                self.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            if reader is not threading.current_thread():
+                reader.join()
+        try:
+            self.socket.close()
+        except OSError:
+            pass
+        with self.lock:
+            self.socket = None
+            self.reader = None
+            self.wbuf.clear()
+            self.read_buffer = ReadBuffer()
+            self.stream_remaining = None
+            self.timings.clear()
+            self.traces.clear()
+            self.__open_socket()
+            self.__login()
+            self.reader_failure = None
+            if reader is not None:
+                self.start_reader()
+
+    def recover(self):
+        """Reconnects after the connection was lost, as the retry_policy
+        allows: up to retry_policy.retries attempts, each after a delay from
+        retry_policy.delay(). Returns whether the connection was replaced.
+        """
+
+        policy = self.retry_policy
+        if policy is None:
+            return False
+        with self.recovery_lock:
+            if self.reader is not None and self.reader_failure is None:
+                # replaced by another thread in the meantime
+                return True
+            for attempt in range(policy.retries):
+                time.sleep(policy.delay(attempt))
+                try:
+                    self.reconnect()
+                    return True
+                except Exception as e:
+                    error("ERROR: Unable to reconnect to %s:%s: %s" % (self.host, self.port, e))
+            return False
+
+    def is_read_only(self, name):
+        """Returns whether the procedure name is known not to modify data."""
+
+        return name in RetryPolicy.READ_ONLY_PROCEDURES
 
     # Front end to SSL socket support.
     #
@@ -417,12 +1328,66 @@ class FastSerializer:
     #   installation default cacerts
     # - if default_cacerts is false, no certificate checks will be
     #   done; we will blindly accept the server's cert
+    #
+    # Contexts are cached for the process by configuration: the properties,
+    # the size and modification time of the files they name, default_cacerts
+    # and the TLS environment variables. The keystores are then read and
+    # converted only once, and connections to a server resume the last TLS
+    # session established with it.
+
+    def __wrap_socket(self, ss, address):
+        context = self.ssl_context()
+        self.__ssl_session_key = (self.ssl_context_key, address)
+        with ssl_cache_lock:
+            session = ssl_sessions.get(self.__ssl_session_key)
+        return context.wrap_socket(ss, session = session)
+
+    def __save_ssl_session(self):
+        # saved once a response was received, TLS 1.3 sends session tickets
+        # after the handshake
+        session = self.socket.session
+        if session is not None:
+            with ssl_cache_lock:
+                ssl_sessions[self.__ssl_session_key] = session
+
+    @staticmethod
+    def clear_ssl_cache():
+        """Forgets the cached TLS contexts and sessions."""
+
+        with ssl_cache_lock:
+            ssl_contexts.clear()
+            ssl_sessions.clear()
+
+    def ssl_context(self):
+        """Returns an ssl.SSLContext set up from the SSL configuration."""
 
-    def __wrap_socket(self, ss):
         parsed_config = {}
         if self.ssl_config_file:
             parsed_config = self.__process_ssl_config_file()
 
+        key = self.__ssl_context_key(parsed_config)
+        self.ssl_context_key = key
+        with ssl_cache_lock:
+            cached = ssl_contexts.get(key)
+        if cached is not None:
+            context, ssl_config = cached
+            self.ssl_config = dict(ssl_config)
+            return context
+        context = self.__new_ssl_context(parsed_config)
+        with ssl_cache_lock:
+            ssl_contexts[key] = (context, dict(self.ssl_config))
+        return context
+
+    def __ssl_context_key(self, parsed_config):
+        files = []
+        for name in ('keystore', 'truststore', 'cacerts'):
+            if parsed_config.get(name):
+                st = os.stat(parsed_config[name])
+                files.append((st.st_size, st.st_mtime_ns))
+        return (tuple(sorted(parsed_config.items())), tuple(files), self.default_cacerts,
+                os.getenv('TLS_ENABLED_PROTOCOLS'), os.getenv('TLS_PREFERRED_CIPHERS'))
+
+    def __new_ssl_context(self, parsed_config):
         # Process keystore/truststore files; non-PEM files need conversion to PEM
 
         keystore_type = truststore_type = None
@@ -491,7 +1456,7 @@ class FastSerializer:
                 except ssl.SSLError as ex:
                     print("TLS_PREFERRED_CIPHERS ignored: %s" % ex)
 
-        return context.wrap_socket(ss)
+        return context
 
     def __process_ssl_config_file(self):
         resolved_file = os.path.expandvars(os.path.expanduser(self.ssl_config_file))
@@ -752,7 +1717,24 @@ class FastSerializer:
         return f
 
     def __compileStructs(self):
-        # Compiled structs for each type
+        # Structs for single values; the input byte order applies to reads
+        # and to floats, other values are always written in network order
+        structs = self.STRUCTS[self.inputBOM]
+        self.byteStruct = structs['byte']
+        self.int16Struct = structs['int16']
+        self.int32Struct = structs['int32']
+        self.int64Struct = structs['int64']
+        self.float64Struct = structs['float64']
+        self.pointStruct = structs['point']
+        # arrays of floats are converted with array.array, swapped when the
+        # input byte order is not the native one
+        self.swapFloat64 = (self.inputBOM == self.BIG_ENDIAN) != (sys.byteorder == 'big')
+        structs = self.STRUCTS[self.BIG_ENDIAN]
+        self.int16Writer = structs['int16']
+        self.int32Writer = structs['int32']
+        self.int64Writer = structs['int64']
+
+        # Format strings for arrays of each type
         self.byteType = lambda length : '%c%db' % (self.inputBOM, length)
         self.ubyteType = lambda length : '%c%dB' % (self.inputBOM, length)
         self.int16Type = lambda length : '%c%dh' % (self.inputBOM, length)
@@ -764,40 +1746,261 @@ class FastSerializer:
         self.varbinaryType = lambda length : '%c%ds' % (self.inputBOM, length)
 
     def close(self):
-        if self.dump_file != None:
-            self.dump_file.close()
+        if self.reader is not None:
+            # wake up the reader thread blocked in recv()
+            try:
+                self.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            if self.reader is not threading.current_thread():
+                self.reader.join()
+        if self.capture is not None:
+            self.capture.close()
         self.socket.close()
 
-    def authenticate(self, username, password):
-        # Requires sending a length preceded username and password even if
-        # authentication is turned off.
+    def is_pipelined(self):
+        """Returns True once responses are being read by a background reader
+        thread, at which point all calls on this connection must go through
+        invoke().
+        """
 
-        #protocol version
-        self.writeByte(1)
-        #sha256
-        self.writeByte(1)
+        return self.reader is not None
 
-        # service requested
-        if (self.usekerberos):
-            self.writeString("kerberos")
-        else:
-            self.writeString("database")
+    def start_reader(self):
+        """Starts the background thread that reads responses and matches
+        them to pending invocations by client handle.
+        """
 
-        if username:
-            # utf8 encode supplied username or kerberos principal name
-            self.writeString(username)
-        else:
-            # no username, just output length of 0
-            self.writeString("")
+        with self.lock:
+            if self.reader is not None:
+                return
+            if self.socket is None:
+                error("ERROR: not connected to server.")
+                raise IOError("No Connection")
+            # the reader blocks until a response arrives, timeouts are
+            # applied to the individual calls instead
+            self.socket.settimeout(None)
+            self.reader = threading.Thread(target=self.__read_responses,
+                                           name="voltdbclient-reader-%s:%s" % (self.host, self.port))
+            self.reader.daemon = True
+            self.reader.start()
+
+    def invoke(self, procedure, params, callback = None):
+        """Sends an invocation of procedure (a VoltProcedure) without waiting
+        for the response. Returns a concurrent.futures.Future which will be
+        completed with the VoltResponse. If callback is given it is called
+        with the VoltResponse from the reader thread.
+        """
 
-        # password supplied, sha-256 hash it
-        m = hashlib.sha256()
-        encoded_password = password.encode("utf-8")
-        m.update(encoded_password)
-        pwHash = bytearray(m.digest())
-        self.wbuf.extend(pwHash)
+        future = futures.Future()
+        with self.lock:
+            if self.reader_failure is None:
+                self.start_reader()
+                handle = next(self.handles)
+                self.pending[handle] = (future, callback)
+                try:
+                    procedure.writeInvocation(self, params, handle)
+                    self.flush()
+                except:
+                    self.pending.pop(handle, None)
+                    self.timings.pop(handle, None)
+                    self.wbuf.clear()
+                    raise
+                return future
+        self.__complete(future, callback, VoltResponse.lost(self.reader_failure))
+        return future
+
+    def invoke_many(self, procedure, param_rows, callback = None):
+        """As invoke(), for one invocation of procedure per list of
+        parameters in param_rows. The invocations are written back to back
+        and sent with a single write per BATCH_FLUSH_SIZE bytes. Returns the
+        list of futures, in the order of param_rows. If an invocation can
+        not be serialized, the ones before it are sent, and the error is
+        raised with their futures as its futures attribute.
+        """
 
-        self.prependLength()
+        result = []
+        with self.lock:
+            if self.reader_failure is None:
+                self.start_reader()
+                unsent = []
+                try:
+                    for params in param_rows:
+                        handle = next(self.handles)
+                        position = self.wbuf.tell()
+                        try:
+                            procedure.writeInvocation(self, params, handle)
+                        except Exception as e:
+                            # drop what was written of it
+                            self.wbuf.truncate(position)
+                            if unsent:
+                                self.flush()
+                                unsent = []
+                            e.futures = result
+                            raise
+                        future = futures.Future()
+                        self.pending[handle] = (future, callback)
+                        unsent.append(handle)
+                        result.append(future)
+                        if self.wbuf.size() >= self.BATCH_FLUSH_SIZE:
+                            self.flush()
+                            unsent = []
+                    if unsent:
+                        self.flush()
+                except:
+                    for handle in unsent:
+                        self.pending.pop(handle, None)
+                        self.timings.pop(handle, None)
+                    self.wbuf.clear()
+                    raise
+                return result
+            for params in param_rows:
+                future = futures.Future()
+                self.__complete(future, callback, VoltResponse.lost(self.reader_failure))
+                result.append(future)
+        return result
+
+    def cancel(self, future):
+        """Stops waiting for the response to an invocation, e.g. after a
+        timeout. A response arriving later is discarded.
+        """
+
+        with self.lock:
+            for handle, entry in list(self.pending.items()):
+                if entry[0] is future:
+                    del self.pending[handle]
+                    self.record_timeout(handle)
+                    return True
+        return False
+
+    def __read_responses(self):
+        try:
+            while True:
+                response = VoltResponse(self)
+                entry = self.pending.pop(response.clientHandle, None)
+                if entry is not None:
+                    self.record_response(response)
+                    self.__complete(entry[0], entry[1], response)
+        except Exception as e:
+            reason = str(e) or "Connection broken"
+        with self.lock:
+            self.reader_failure = reason
+            pending, self.pending = self.pending, {}
+        for handle, (future, callback) in pending.items():
+            response = VoltResponse.lost(reason)
+            self.record_response(response, handle)
+            self.__complete(future, callback, response)
+
+    def record_invocation(self, handle, name, sent, start):
+        """Starts timing the invocation with client handle handle of the
+        procedure name, whose message is sent bytes long and was written
+        from start, a time.perf_counter_ns() value. Called by
+        VoltProcedure.writeInvocation() when the connection has stats or a
+        tracer.
+        """
+
+        if self.stats is not None:
+            self.timings[handle] = (name, start, sent)
+        if self.tracer is not None:
+            self.tracer.phase(self, name, handle, CallTracer.SERIALIZE, start, time.perf_counter_ns())
+            if self.wbuf.traced is None:
+                self.wbuf.traced = []
+            self.wbuf.traced.append((handle, name))
+
+    def trace_sending(self, traced):
+        """Starts the send phase of the traced invocations, the (handle,
+        procedure name) pairs written to the buffer about to be sent. Their
+        responses may be received before trace_sent() is called.
+        """
+
+        start = time.perf_counter_ns()
+        with self.trace_lock:
+            for handle, name in traced:
+                self.traces[handle] = [name, start, None]
+
+    def trace_sent(self, traced):
+        "Ends the send phase of the traced invocations, once they are sent."
+
+        end = time.perf_counter_ns()
+        with self.trace_lock:
+            for handle, name in traced:
+                trace = self.traces.get(handle)
+                if trace is not None:
+                    self.__endSend(handle, trace, end)
+
+    def __endSend(self, handle, trace, end):
+        # with trace_lock, ends the send phase of trace at end, unless it
+        # has ended
+        if trace[2] is None:
+            trace[2] = end
+            self.tracer.phase(self, trace[0], handle, CallTracer.SEND, trace[1], end)
+
+    def trace_response(self, response, received):
+        """Ends the wait phase of the invocation of response at received,
+        and its decode phase now.
+        """
+
+        with self.trace_lock:
+            trace = self.traces.pop(response.clientHandle, None)
+            if trace is not None:
+                # the response may be received before the sender sees the
+                # end of the send
+                self.__endSend(response.clientHandle, trace, received)
+        if trace is not None:
+            name, start, sent = trace
+            self.tracer.phase(self, name, response.clientHandle, CallTracer.WAIT, sent, received)
+            self.tracer.phase(self, name, response.clientHandle, CallTracer.DECODE,
+                              received, time.perf_counter_ns())
+            self.tracer.finished(self, name, response.clientHandle, response)
+
+    def record_response(self, response, handle = None):
+        """Records the response to the invocation with client handle handle,
+        by default the one of the response, in stats. A response from the
+        server is the last message received. A response made by the client,
+        e.g. when the connection is lost, also ends the trace.
+        """
+
+        if handle is None:
+            handle = response.clientHandle
+        if self.tracer is not None:
+            with self.trace_lock:
+                trace = self.traces.pop(handle, None)
+            if trace is not None:
+                self.tracer.finished(self, trace[0], handle, response)
+        if self.stats is None:
+            return
+        timing = self.timings.pop(handle, None)
+        if timing is not None:
+            name, start, sent = timing
+            received = 0
+            if response.roundtripTime >= 0:
+                received = self.int32Struct.unpack_from(self.responseprefix)[0] + 4
+            self.stats.record(name, (time.perf_counter_ns() - start) / 1e9, response, sent, received)
+
+    def record_timeout(self, handle):
+        "Records that the invocation with client handle handle timed out."
+
+        if self.tracer is not None:
+            with self.trace_lock:
+                trace = self.traces.pop(handle, None)
+            if trace is not None:
+                self.tracer.finished(self, trace[0], handle, None)
+        if self.stats is None:
+            return
+        timing = self.timings.pop(handle, None)
+        if timing is not None:
+            self.stats.record_timeout(timing[0], timing[2])
+
+    def __complete(self, future, callback, response):
+        future.set_result(response)
+        if callback is not None:
+            try:
+                callback(response)
+            except Exception as e:
+                error("ERROR: exception in procedure callback: %s" % e)
+
+    def authenticate(self, username, password):
+        self.writeLoginRequest(username, password)
         self.flush()
 
         ioerror_message = "ERROR: Connection failed. Please check that the host, port, and ssl settings are correct."
@@ -865,32 +2068,67 @@ class FastSerializer:
             except Exception as e:
                 raise RuntimeError("Authentication failed.")
 
+        self.readLoginResponse(status)
 
-        if status != 0:
-            reason = "Authentication failed."
-            # Must match assignments in Constants.java
-            status_text = ("Server has too many connections.",
-                           "Connection timed out during authentication.",
-                           "Wire protocol format violation error.",
-                           "Failed to authenticate to rejoining node.",
-                           "Export not enabled for server.",
-                           "Server requires use of TLS/SSL.",
-                           "Client certificate required for mutual authentication.")
-            if status > 0 and status <= len(status_text):
-                reason = status_text[status-1]
-            raise RuntimeError(reason)
+    def writeLoginRequest(self, username, password):
+        # Requires sending a length preceded username and password even if
+        # authentication is turned off.
 
-        self.readInt32()
-        self.readInt64()
-        self.readInt64()
-        self.readInt32()
-        for x in range(self.readInt32()):
-            self.readByte()
+        #protocol version
+        self.writeByte(1)
+        #sha256
+        self.writeByte(1)
 
-    def has_ticket(self):
-        '''
-        Checks to see if the user has a valid ticket.
-        '''
+        # service requested
+        if (self.usekerberos):
+            self.writeString("kerberos")
+        else:
+            self.writeString("database")
+
+        if username:
+            # utf8 encode supplied username or kerberos principal name
+            self.writeString(username)
+        else:
+            # no username, just output length of 0
+            self.writeString("")
+
+        # password supplied, sha-256 hash it
+        m = hashlib.sha256()
+        encoded_password = password.encode("utf-8")
+        m.update(encoded_password)
+        pwHash = bytearray(m.digest())
+        self.wbuf.extend(pwHash)
+
+        self.prependLength()
+
+    def readLoginResponse(self, status):
+        if status != 0:
+            reason = "Authentication failed."
+            # Must match assignments in Constants.java
+            status_text = ("Server has too many connections.",
+                           "Connection timed out during authentication.",
+                           "Wire protocol format violation error.",
+                           "Failed to authenticate to rejoining node.",
+                           "Export not enabled for server.",
+                           "Server requires use of TLS/SSL.",
+                           "Client certificate required for mutual authentication.")
+            if status > 0 and status <= len(status_text):
+                reason = status_text[status-1]
+            raise RuntimeError(reason)
+
+        # identifies the server, used to route invocations to the partition
+        # leaders on that server
+        self.host_id = self.readInt32()
+        self.connection_id = self.readInt64()
+        self.cluster_start_timestamp = self.readInt64()
+        self.leader_address = self.readInt32()
+        for x in range(self.readInt32()):
+            self.readByte()
+
+    def has_ticket(self):
+        '''
+        Checks to see if the user has a valid ticket.
+        '''
         default_cred = None
         retval = False
         try:
@@ -915,55 +2153,135 @@ class FastSerializer:
         self.__compileStructs()
 
     def prependLength(self):
-        # write 32 bit array length at offset 0, NOT including the
-        # size of this length preceding value. This value is written
-        # in the network order.
-        ttllen = self.wbuf.buffer_info()[1] * self.wbuf.itemsize
-        lenBytes = int32toBytes(ttllen)
-        #lenBytes = struct.pack(self.inputBOM + 'i', ttllen)
-        [self.wbuf.insert(0, x) for x in lenBytes[::-1]]
+        # write 32 bit message length in the slot reserved at the start of
+        # the message, NOT including the size of this length preceding
+        # value. This value is written in the network order.
+        self.wbuf.prepend_length()
 
     def size(self):
         """Returns the size of the write buffer.
         """
 
-        return (self.wbuf.buffer_info()[1] * self.wbuf.itemsize)
+        return self.wbuf.size()
 
     def flush(self):
         if self.socket is None:
             error("ERROR: not connected to server.")
             raise IOError("No Connection")
 
-        if self.dump_file != None:
-            self.dump_file.write(self.wbuf)
-            self.dump_file.write(b"\n")
-        self.socket.sendall(self.wbuf.tobytes())
-        self.wbuf = array.array('B')
+        if self.stream_remaining is not None:
+            # the rest of an abandoned streamed response is received first,
+            # so that it is captured before this message
+            self.endStreaming()
+        if self.capture is not None:
+            self.capture.sent(self.wbuf.getvalue())
+        traced = self.wbuf.traced
+        if traced is not None:
+            self.trace_sending(traced)
+        try:
+            self.wbuf.send(self.socket)
+        finally:
+            self.wbuf.clear()
+            if traced is not None:
+                self.trace_sent(traced)
+
+    def takeRawBytes(self):
+        """Returns the contents of the write buffer and starts a new one.
+        """
+
+        data = self.wbuf.getvalue()
+        if self.capture is not None:
+            self.capture.sent(data)
+        self.wbuf.clear()
+        return data
 
     def bufferForRead(self):
         if self.socket is None:
             error("ERROR: not connected to server.")
             raise IOError("No Connection")
 
+        if self.stream_remaining is not None:
+            self.endStreaming()
+
         # fully buffer a new length preceded message from socket
-        # read the length. the read until the buffer is completed.
-        responseprefix = bytes()
-        while (len(responseprefix) < 4):
-            responseprefix += self.socket.recv(4 - len(responseprefix))
-            if responseprefix == b'':
-                raise IOError("Connection broken")
-        if self.dump_file != None:
-            self.dump_file.write(responseprefix)
-        responseLength = struct.unpack(self.int32Type(1), responseprefix)[0]
+        # read the length. then read until the buffer is completed, straight
+        # into the read buffer.
+        self.recvInto(self.responseprefix)
+        responseLength = self.int32Struct.unpack_from(self.responseprefix)[0]
+        self.recvInto(self.read_buffer.reserve(responseLength))
+        if self.capture is not None:
+            self.capture.received(self.responseprefix, self.read_buffer.get_buffer())
+
+    def bufferForStreaming(self):
+        """As bufferForRead(), but only receives the length of the message.
+        The rest is received in chunks as it is read, so the message does not
+        have to fit in memory; endStreaming() drops what is left of it.
+        """
+
+        if self.socket is None:
+            error("ERROR: not connected to server.")
+            raise IOError("No Connection")
+        if self.stream_remaining is not None:
+            self.endStreaming()
+
+        self.recvInto(self.responseprefix)
+        if self.capture is not None:
+            # recorded with the first chunk, see __captureChunk()
+            self.stream_prefix = bytes(self.responseprefix)
+        self.stream_remaining = self.int32Struct.unpack_from(self.responseprefix)[0]
         self.read_buffer.clear()
-        remaining = responseLength
-        while remaining > 0:
-            message = self.socket.recv(remaining)
-            self.read_buffer.append(message)
-            remaining = responseLength - self.read_buffer.buffer_length()
-        if not self.dump_file is None:
-            self.dump_file.write(self.read_buffer.get_buffer())
-            self.dump_file.write(b"\n")
+        self.read_buffer.source = self.__streamMore
+
+    def __streamMore(self, missing):
+        if missing > self.stream_remaining:
+            return False
+        count = min(max(missing, self.STREAM_CHUNK), self.stream_remaining)
+        view = self.read_buffer.extend(count)
+        self.recvInto(view)
+        self.stream_remaining -= count
+        if self.capture is not None:
+            self.__captureChunk(view)
+        return True
+
+    def __captureChunk(self, view):
+        if self.stream_prefix is not None:
+            self.capture.received(self.stream_prefix, view)
+            self.stream_prefix = None
+        else:
+            self.capture.continued(view)
+
+    def endStreaming(self):
+        """Receives and drops the rest of the streamed message."""
+
+        self.read_buffer.source = None
+        remaining, self.stream_remaining = self.stream_remaining, None
+        while remaining:
+            view = self.read_buffer.reserve(min(remaining, self.STREAM_CHUNK))
+            self.recvInto(view)
+            if self.capture is not None:
+                self.__captureChunk(view)
+            remaining -= len(view)
+        self.read_buffer.clear()
+
+    def recvInto(self, view):
+        # fill view, a writable buffer, from the socket
+        view = memoryview(view)
+        received = 0
+        while received < len(view):
+            count = self.socket.recv_into(view[received:])
+            if count == 0:
+                raise IOError("Connection broken")
+            received += count
+
+    def bufferFromBytes(self, responseprefix, message):
+        """Makes a message already received by other means, with its length
+        prefix, the current read buffer.
+        """
+
+        if self.capture is not None:
+            self.capture.received(responseprefix, message)
+        self.responseprefix[:] = responseprefix
+        self.read_buffer.wrap(message)
 
     def read(self, type):
         if type not in self.READER:
@@ -992,7 +2310,7 @@ class FastSerializer:
         return self.write(type, value)
 
     def getRawBytes(self):
-        return self.wbuf
+        return self.wbuf.getvalue()
 
     def writeRawBytes(self, value):
         """Appends the given raw bytes to the end of the write buffer.
@@ -1016,6 +2334,12 @@ class FastSerializer:
     def writeNull(self, value):
         return
 
+    def readVoltTable(self):
+        return VoltTable(self).readFromSerializer()
+
+    def writeVoltTable(self, table):
+        table.writeToSerializer(self)
+
     def writeArray(self, type, array):
         if (not array) or (len(array) == 0) or (not type):
             return
@@ -1054,15 +2378,11 @@ class FastSerializer:
         return val
 
     def readByte(self):
-        val = self.readByteArrayContent(1)[0]
-        return self.NullCheck[self.VOLTTYPE_TINYINT](val)
+        val = self.read_buffer.unpack_struct(self.byteStruct)[0]
+        return None if val == self.NULL_TINYINT_INDICATOR else val
 
     def readByteRaw(self):
-        val = self.readByteArrayContent(1)[0]
-        if val > 127:
-            return val - 256
-        else:
-            return val
+        return self.read_buffer.unpack_struct(self.byteStruct)[0]
 
     def writeByte(self, value):
         if value == None:
@@ -1083,15 +2403,15 @@ class FastSerializer:
         return val
 
     def readInt16(self):
-        val = self.readInt16ArrayContent(1)[0]
-        return self.NullCheck[self.VOLTTYPE_SMALLINT](val)
+        val = self.read_buffer.unpack_struct(self.int16Struct)[0]
+        return None if val == self.NULL_SMALLINT_INDICATOR else val
 
     def writeInt16(self, value):
         if value == None:
             val = self.__class__.NULL_SMALLINT_INDICATOR
         else:
             val = value
-        self.wbuf.extend(int16toBytes(val))
+        self.wbuf.pack_into(self.int16Writer, val)
 
     # int32
     def readInt32ArrayContent(self, cnt):
@@ -1105,15 +2425,15 @@ class FastSerializer:
         return val
 
     def readInt32(self):
-        val = self.readInt32ArrayContent(1)[0]
-        return self.NullCheck[self.VOLTTYPE_INTEGER](val)
+        val = self.read_buffer.unpack_struct(self.int32Struct)[0]
+        return None if val == self.NULL_INTEGER_INDICATOR else val
 
     def writeInt32(self, value):
         if value == None:
             val = self.__class__.NULL_INTEGER_INDICATOR
         else:
             val = value
-        self.wbuf.extend(int32toBytes(val))
+        self.wbuf.pack_into(self.int32Writer, val)
 
     # int64
     def readInt64ArrayContent(self, cnt):
@@ -1127,20 +2447,19 @@ class FastSerializer:
         return val
 
     def readInt64(self):
-        val = self.readInt64ArrayContent(1)[0]
-        return self.NullCheck[self.VOLTTYPE_BIGINT](val)
+        val = self.read_buffer.unpack_struct(self.int64Struct)[0]
+        return None if val == self.NULL_BIGINT_INDICATOR else val
 
     def writeInt64(self, value):
         if value == None:
             val = self.__class__.NULL_BIGINT_INDICATOR
         else:
             val = value
-        self.wbuf.extend(int64toBytes(val))
+        self.wbuf.pack_into(self.int64Writer, val)
 
     # float64
     def readFloat64ArrayContent(self, cnt):
-        offset = cnt * struct.calcsize('d')
-        return self.read_buffer.unpack(self.float64Type(cnt), offset)
+        return tuple(self.float64Values(self.read_buffer.take(cnt * 8)))
 
     def readFloat64Array(self):
         length = self.readInt16()
@@ -1149,30 +2468,47 @@ class FastSerializer:
         return val
 
     def readFloat64(self):
-        val = self.readFloat64ArrayContent(1)[0]
-        return self.NullCheck[self.VOLTTYPE_FLOAT](val)
+        val = self.read_buffer.unpack_struct(self.float64Struct)[0]
+        return None if abs(val - self.NULL_FLOAT_INDICATOR) < 1e307 else val
 
     def writeFloat64(self, value):
         if value == None:
             val = self.__class__.NULL_FLOAT_INDICATOR
         else:
             val = float(value)
-        ba = bytearray(struct.pack(self.float64Type(1), val))
-        self.wbuf.extend(ba)
+        self.wbuf.pack_into(self.float64Struct, val)
+
+    def float64Values(self, data):
+        """Returns the float64 values in data, a bytes-like object, in the
+        input byte order, as an array.array.
+        """
+
+        values = array.array('d')
+        values.frombytes(data)
+        if self.swapFloat64:
+            values.byteswap()
+        return values
+
+    def float64Bytes(self, values):
+        "Returns values, float64 values, as bytes in the input byte order."
+
+        values = array.array('d', values)
+        if self.swapFloat64:
+            values.byteswap()
+        return values.tobytes()
 
     # string
     def readStringContent(self, cnt):
         if cnt == 0:
             return ""
 
-        offset = cnt * struct.calcsize('c')
-        val = self.read_buffer.unpack(self.stringType(cnt), offset)
-        return val[0].decode("utf-8")
+        # decode straight from the read buffer
+        return str(self.read_buffer.take(cnt), "utf-8")
 
     def readString(self):
         # length preceeded (4 byte value) string
         length = self.readInt32()
-        if self.NullCheck[self.VOLTTYPE_STRING](length) == None:
+        if length == self.NULL_STRING_INDICATOR:
             return None
         return self.readStringContent(length)
 
@@ -1200,15 +2536,14 @@ class FastSerializer:
         if cnt == 0:
             return array.array('B', [])
 
-        offset = cnt * struct.calcsize('c')
-        val = self.read_buffer.unpack(self.varbinaryType(cnt), offset)
-
-        return array.array('B', val[0])
+        val = array.array('B')
+        val.frombytes(self.read_buffer.take(cnt))
+        return val
 
     def readVarbinary(self):
         # length preceeded (4 byte value) string
         length = self.readInt32()
-        if self.NullCheck[self.VOLTTYPE_VARBINARY](length) == None:
+        if length == self.NULL_STRING_INDICATOR:
             return None
         return self.readVarbinaryContent(length)
 
@@ -1222,14 +2557,14 @@ class FastSerializer:
 
     # date
     # The timestamp we receive from the server is a 64-bit integer representing
-    # microseconds since the epoch. It will be converted to a datetime object in
-    # the local timezone.
+    # microseconds since the epoch. It is converted according to the
+    # timestamp_mode, by default to a naive datetime object in the local
+    # timezone.
     def readDate(self):
         raw = self.readInt64()
         if raw == None:
             return None
-        # microseconds before or after Jan 1, 1970 UTC
-        return datetime.datetime.fromtimestamp(raw/1000000.0)
+        return self.__dateFromMicroseconds(raw)
 
     def readDateArray(self):
         retval = []
@@ -1238,71 +2573,85 @@ class FastSerializer:
         for i in raw:
             val = None
             if i != None:
-                val = datetime.datetime.fromtimestamp(i/1000000.0)
+                val = self.dateFromMicroseconds(i)
             retval.append(val)
 
         return tuple(retval)
 
+    # raw is in microseconds before or after Jan 1, 1970 UTC
+    def dateFromMicroseconds(self, raw):
+        return self.__dateFromMicroseconds(raw)
+
+    # Far from the epoch, where a float of seconds would lose microseconds,
+    # datetimes are built with integer arithmetic.
+    def __localDate(self, raw):
+        if -self.FLOAT_EXACT_MICROSECONDS < raw < self.FLOAT_EXACT_MICROSECONDS:
+            return datetime.datetime.fromtimestamp(raw / 1000000.0)
+        seconds, microseconds = divmod(raw, 1000000)
+        return datetime.datetime.fromtimestamp(seconds).replace(microsecond = microseconds)
+
+    def __utcDate(self, raw):
+        if -self.FLOAT_EXACT_MICROSECONDS < raw < self.FLOAT_EXACT_MICROSECONDS:
+            return datetime.datetime.fromtimestamp(raw / 1000000.0, datetime.timezone.utc)
+        return self.EPOCH_UTC + datetime.timedelta(0, 0, raw)
+
+    def __rawDate(self, raw):
+        return raw
+
+    def __datetime64(self, raw):
+        return numpy.datetime64(raw, 'us')
+
+    # value is a datetime, an int of microseconds since the epoch or a numpy
+    # datetime64. Naive datetimes are in the local timezone, or in UTC with
+    # TIMESTAMP_UTC.
     def writeDate(self, value):
         if value is None:
             val = self.__class__.NULL_BIGINT_INDICATOR
+        elif isinstance(value, int):
+            val = value
+        elif isinstance(value, datetime.datetime):
+            if value.tzinfo is None and self.timestamp_mode != self.TIMESTAMP_UTC:
+                # timestamp() honours fold, e.g. for the repeated hour
+                # when daylight saving time ends, which mktime() does not
+                seconds = int(value.replace(microsecond = 0).timestamp())
+                val = seconds * 1000000 + value.microsecond
+            else:
+                if value.tzinfo is None:
+                    value = value.replace(tzinfo = datetime.timezone.utc)
+                delta = value - self.EPOCH_UTC
+                val = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+        elif numpy_available and isinstance(value, numpy.datetime64):
+            val = int(value.astype('datetime64[us]').astype(numpy.int64))
         else:
-            seconds = int(value.strftime("%s"))
-            val = seconds * 1000000 + value.microsecond
-        self.wbuf.extend(int64toBytes(val))
+            raise TypeError("Can not write %s as a timestamp" % type(value).__name__)
+        self.wbuf.pack_into(self.int64Writer, val)
 
+    # A decimal is its unscaled value, as a 128-bit two's complement integer
+    # in network order, with a scale of 12. The smallest value is NULL.
     def readDecimal(self):
-        offset = 16 * struct.calcsize('b')
-        if self.NullCheck[self.VOLTTYPE_DECIMAL](self.read_buffer.read(offset)) == None:
-            self.read_buffer.shift(offset)
+        value = int.from_bytes(self.read_buffer.take(16), "big", signed = True)
+        if value == self.__class__.NULL_DECIMAL_INDICATOR:
             return None
-        val = list(self.read_buffer.unpack(self.ubyteType(16), offset))
-        mostSignificantBit = 1 << 7
-        isNegative = (val[0] & mostSignificantBit) != 0
-        unscaledValue = -(val[0] & mostSignificantBit) << 120
-        # Clear the highest bit
-        # Unleash the powers of the butterfly
-        val[0] &= ~mostSignificantBit
-        # Get the 2's complement
-        for x in range(16):
-            unscaledValue += val[x] << ((15 - x) * 8)
-        unscaledValue = [int(x) for x in str(abs(unscaledValue))]
-        return decimal.Decimal((isNegative, tuple(unscaledValue),
-                                -self.__class__.DEFAULT_DECIMAL_SCALE))
+        return decimal.Decimal(value).scaleb(-self.__class__.DEFAULT_DECIMAL_SCALE,
+                                             self.DECIMAL_CONTEXT)
 
     def readDecimalArray(self):
-        retval = []
         cnt = self.readInt16()
-        for i in range(cnt):
-            retval.append(self.readDecimal())
-        return tuple(retval)
-
-    def __intToBytes(self, value, sign):
-        value_bytes = bytes()
-        if sign == 1:
-            value = ~value + 1      # 2's complement
-        # Turn into byte array
-        while value != 0 and value != -1:
-            byte = value & 0xff
-            # flip the high order bits to 1 only if the number is negative and
-            # this is the highest order byte
-            if value >> 8 == 0 and sign == 1:
-                mask = 1 << 7
-                while mask > 0 and (byte & mask) == 0:
-                    byte |= mask
-                    mask >> 1
-            value_bytes = struct.pack(self.ubyteType(1), byte) + value_bytes
-            value = value >> 8
-        if len(value_bytes) > 16:
-            raise ValueError("Precision of this decimal is >38 digits");
-        if sign == 1:
-            ret = struct.pack(self.ubyteType(1), 0xff)
-        else:
-            ret = struct.pack(self.ubyteType(1), 0)
-        # Pad it
-        ret *= 16 - len(value_bytes)
-        ret += value_bytes
-        return ret
+        return tuple(self.decimalsFromBytes(self.read_buffer.take(16 * cnt)))
+
+    def decimalsFromBytes(self, data):
+        """Decodes data, consecutive 16 byte decimals, into a list."""
+
+        from_bytes = int.from_bytes
+        Decimal = decimal.Decimal
+        null = self.__class__.NULL_DECIMAL_INDICATOR
+        scale = -self.__class__.DEFAULT_DECIMAL_SCALE
+        context = self.DECIMAL_CONTEXT
+        values = []
+        for i in range(0, len(data), 16):
+            value = from_bytes(data[i:i + 16], "big", signed = True)
+            values.append(None if value == null else Decimal(value).scaleb(scale, context))
+        return values
 
     def writeDecimal(self, num):
         if num is None:
@@ -1320,10 +2669,8 @@ class FastSerializer:
         if rest > 26:
             raise ValueError("Precision to the left of the decimal point is %d"
                              " and the max is 26" % (rest))
-        scale_factor = self.__class__.DEFAULT_DECIMAL_SCALE - scale
-        unscaled_int = int(decimal.Decimal((0, digits, scale_factor)))
-        data = self.__intToBytes(unscaled_int, sign)
-        self.wbuf.extend(data)
+        unscaled = int(num.scaleb(self.__class__.DEFAULT_DECIMAL_SCALE, self.DECIMAL_CONTEXT))
+        self.wbuf.extend(unscaled.to_bytes(16, "big", signed = True))
 
     def writeDecimalString(self, num):
         if num is None:
@@ -1339,31 +2686,28 @@ class FastSerializer:
         return self.readInt64()
 
     def readGeographyPoint(self):
-        # returns a tuple of a pair of doubles representing lat,long
-        lng = self.readFloat64()
-        lat = self.readFloat64()
-        if (lat == Geography.NULL_COORD) and (lon == Geography.NULL_COORD):
+        # returns a tuple of a pair of doubles representing long,lat
+        point = self.read_buffer.unpack_struct(self.pointStruct)
+        if point == Geography.NULL_POINT:
             return None
-        return (lng, lat)
+        return point
 
     def readGeographyPointArray(self):
-        retval = []
         cnt = self.readInt16()
-        for i in range(cnt):
-            retval.append(self.readGeographyPoint())
-        return tuple(retval)
+        values = self.float64Values(self.read_buffer.take(16 * cnt))
+        points = zip(values[0::2], values[1::2])
+        return tuple(None if point == Geography.NULL_POINT else point for point in points)
 
     def writeGeographyPoint(self, point):
         if point is None:
             self.writeFloat64(Geography.NULL_COORD)
             self.writeFloat64(Geography.NULL_COORD)
             return
-        if not isinstance(num, tuple):
+        if not isinstance(point, tuple):
             raise TypeError("point must be a 2-tuple of floats")
-        if len(tuple) != 2:
+        if len(point) != 2:
             raise TypeError("point must be a 2-tuple of floats")
-        self.writeFloat64(point[0])
-        self.writeFloat64(point[1])
+        self.wbuf.pack_into(self.pointStruct, float(point[0]), float(point[1]))
 
     def readGeography(self):
         return Geography.unflatten(self)
@@ -1377,7 +2721,7 @@ class FastSerializer:
 
     def writeGeography(self, geo):
         if geo is None:
-            writeInt32(NULL_STRING_INDICATOR)
+            self.writeInt32(self.NULL_STRING_INDICATOR)
         else:
             geo.flatten(self)
 
@@ -1433,10 +2777,64 @@ class Geography(object):
 
     EPSILON = 1.0e-12
     NULL_COORD = 360.0
+    NULL_POINT = (NULL_COORD, NULL_COORD)
 
     def __init__(self, loops=[]):
         self.loops = loops
 
+    # A polygon is held as the lists of XYZPoint objects of its loops, or as
+    # the vertices of its loops, one (N, 3) numpy array of x, y, z per loop
+    # (a list of (x, y, z) tuples without numpy). Polygons received from the
+    # server only have the vertices, the XYZPoint objects are only created
+    # if loops is used.
+    @classmethod
+    def fromVertices(cls, vertices):
+        geography = cls(None)
+        geography.__vertices = vertices
+        return geography
+
+    @property
+    def loops(self):
+        if self.__loops is None:
+            self.__loops = [[XYZPoint(x, y, z) for x, y, z in
+                             (vertices.tolist() if numpy_available else vertices)]
+                            for vertices in self.__vertices]
+        return self.__loops
+
+    @loops.setter
+    def loops(self, loops):
+        self.__loops = loops
+        self.__vertices = None
+
+    @property
+    def vertices(self):
+        if self.__vertices is None:
+            self.__vertices = [Geography.__verticesOfLoop(loop) for loop in self.__loops]
+        return self.__vertices
+
+    @staticmethod
+    def __verticesOfLoop(loop):
+        vertices = [(p.x, p.y, p.z) for p in loop]
+        if numpy_available:
+            return numpy.array(vertices, dtype=float).reshape(len(vertices), 3)
+        return vertices
+
+    def lng_lat(self):
+        """Returns the vertices of each loop as (longitude, latitude) pairs
+        in degrees, converted for all the vertices of a loop at once: one
+        (N, 2) numpy array per loop, or a list of tuples without numpy.
+        """
+
+        if not numpy_available:
+            return [[p.toGeogrpahyPoint() for p in loop] for loop in self.loops]
+        points = []
+        for vertices in self.vertices:
+            x, y, z = vertices[:, 0], vertices[:, 1], vertices[:, 2]
+            lat = numpy.arctan2(z, numpy.sqrt(x * x + y * y)) * (180 / math.pi)
+            lng = numpy.arctan2(y, x) * (180 / math.pi)
+            points.append(numpy.column_stack((lng, lat)))
+        return points
+
     # Serialization format for polygons.
     #
     # This is the format used by S2 in the EE.  Most of the
@@ -1475,67 +2873,47 @@ class Geography(object):
     VERTEX_SIZE_IN_BYTES = 24
 
     def serializedSize(self):
-        length = POLYGON_OVERHEAD_IN_BYTES
-        for loop in self.loops:
-            length += loopSerializedSize(loop);
+        length = Geography.POLYGON_OVERHEAD_IN_BYTES
+        for loop in self.vertices:
+            length += Geography.loopSerializedSize(loop);
         return length
 
     @staticmethod
     def loopSerializedSize(loop):
-        LOOP_OVERHEAD_IN_BYTES + (len(loop) * VERTEX_SIZE_IN_BYTES)
+        return Geography.LOOP_OVERHEAD_IN_BYTES + (len(loop) * Geography.VERTEX_SIZE_IN_BYTES)
 
+    # The whole polygon is taken from the read buffer at once, the vertices
+    # of each loop are read with a single unpack and the bounds are skipped.
     @staticmethod
     def unflatten(fs):
         length = fs.readInt32() # size
         if (length == fs.NULL_STRING_INDICATOR):
             return None
 
-        version = fs.readByteRaw() # encoding version
-        fs.readByteRaw() # owns loops
-        fs.readByteRaw() # has holes
-        numLoops = fs.readInt32()
-        loops = []
-        indexOfOuterRing = 0
+        data = fs.read_buffer.take(length)
+        int32Struct = fs.int32Struct
+        # encoding version, owns loops, has holes
+        numLoops = int32Struct.unpack_from(data, 3)[0]
+        offset = 7
+        vertices = []
         for i in range(numLoops):
-            depth, loop = Geography.__unflattenLoop(fs)
-            if depth == 0:
-                indexOfOuterRing = i
-            loops.append(loop)
+            # encoding version
+            numVertices = int32Struct.unpack_from(data, offset + 1)[0]
+            offset += 5
+            vertices.append(Geography.__unflattenVertices(fs, data, offset, numVertices))
+            # origin_inside_, depth_ and bound
+            offset += numVertices * Geography.VERTEX_SIZE_IN_BYTES + 5 + Geography.BOUND_LENGTH_IN_BYTES
 
-        Geography.__unflattenBound(fs)
-
-        return Geography(loops);
+        return Geography.fromVertices(vertices)
 
     @staticmethod
-    def __unflattenLoop(fs):
-        # 1 byte     for encoding version
-        # 4 bytes    for number of vertices
-        # number of vertices * 8 * 3  bytes  for vertices as XYZPoints
-        # 1 byte     for origin_inside_
-        # 4 bytes    for depth_
-        # length of bound
-
-        loop = []
-        fs.readByteRaw() # encoding version
-        numVertices = fs.readInt32()
-        for i in range(numVertices):
-            x = fs.readFloat64()
-            y = fs.readFloat64()
-            z = fs.readFloat64()
-            loop.append(XYZPoint(x, y, z))
-
-        fs.readByteRaw() # origin_inside_
-        depth = fs.readInt32() # depth
-        Geography.__unflattenBound(fs);
-        return (depth, loop)
-
-    @staticmethod
-    def __unflattenBound(fs):
-        fs.readByteRaw() # for encoding version
-        fs.readFloat64()
-        fs.readFloat64()
-        fs.readFloat64()
-        fs.readFloat64()
+    def __unflattenVertices(fs, data, offset, count):
+        if numpy_available:
+            # copied out of the read buffer, in native byte order
+            vertices = numpy.frombuffer(data, dtype=fs.inputBOM + 'f8', count=3 * count, offset=offset)
+            return vertices.reshape(count, 3).astype(float)
+        values = fs.float64Values(data[offset:offset + 3 * 8 * count])
+        return list(zip(values[0::3], values[1::3], values[2::3]))
 
     def flatten(self, fs):
         fs.writeInt32(self.serializedSize()) # prepend length
@@ -1543,13 +2921,14 @@ class Geography(object):
         fs.writeByte(0); # encoding version
         fs.writeByte(1); # owns_loops
 
-        if len(self.loops) > 1: # has_holes
+        vertices = self.vertices  # not loops, which would make XYZPoint objects
+        if len(vertices) > 1: # has_holes
             fs.writeByte(1)
         else:
             fs.writeByte(0)
-        fs.writeInt32(len(self.loops))
+        fs.writeInt32(len(vertices))
         depth = 0
-        for loop in self.loops:
+        for loop in vertices:
             Geography.__flattenLoop(loop, depth, fs);
             depth = 1;
         Geography.__flattenEmptyBound(fs);
@@ -1564,10 +2943,10 @@ class Geography(object):
         # length of bound
         fs.writeByte(0);
         fs.writeInt32(len(loop))
-        for xyzp in loop:
-            fs.writeFloat64(xyzp.x)
-            fs.writeFloat64(xyzp.y)
-            fs.writeFloat64(xyzp.z)
+        if numpy_available:
+            fs.wbuf.extend(numpy.asarray(loop, dtype=fs.inputBOM + 'f8').tobytes())
+        else:
+            fs.wbuf.extend(fs.float64Bytes(itertools.chain.from_iterable(loop)))
 
         fs.writeByte(0);  # origin_inside
         fs.writeInt32(depth); # depth
@@ -1667,6 +3046,9 @@ class Geography(object):
 
 class VoltColumn:
     "definition of one VoltDB table column"
+
+    __slots__ = ('type', 'name')
+
     def __init__(self, fser = None, type = None, name = None):
         if fser != None:
             self.type = fser.readByte()
@@ -1690,6 +3072,12 @@ class VoltColumn:
             return True
         return (self.type == other.type and self.name == other.name)
 
+    def __getstate__(self):
+        return (self.type, self.name)
+
+    def __setstate__(self, state):
+        self.type, self.name = state
+
     def readName(self, fser):
         self.name = fser.readString()
 
@@ -1701,10 +3089,65 @@ class VoltColumn:
 
 class VoltTable:
     "definition and content of one VoltDB table"
+
+    __slots__ = ('fser', 'columns', '_tuples', 'arrays', 'nulls', '__make_row',
+                 '__rows', '__decoder', '__fixed', '__rowcount', '__unread')
+
+    # numpy dtypes of the fixed width column types, as serialized
+    COLUMN_DTYPES = {FastSerializer.VOLTTYPE_TINYINT: '>i1',
+                     FastSerializer.VOLTTYPE_SMALLINT: '>i2',
+                     FastSerializer.VOLTTYPE_INTEGER: '>i4',
+                     FastSerializer.VOLTTYPE_BIGINT: '>i8',
+                     FastSerializer.VOLTTYPE_FLOAT: '>f8',
+                     FastSerializer.VOLTTYPE_TIMESTAMP: '>i8'}
+
+    NULL_INDICATORS = {FastSerializer.VOLTTYPE_TINYINT: FastSerializer.NULL_TINYINT_INDICATOR,
+                       FastSerializer.VOLTTYPE_SMALLINT: FastSerializer.NULL_SMALLINT_INDICATOR,
+                       FastSerializer.VOLTTYPE_INTEGER: FastSerializer.NULL_INTEGER_INDICATOR,
+                       FastSerializer.VOLTTYPE_BIGINT: FastSerializer.NULL_BIGINT_INDICATOR,
+                       FastSerializer.VOLTTYPE_TIMESTAMP: FastSerializer.NULL_BIGINT_INDICATOR}
+
+    # width of the column types whose values have a fixed size
+    COLUMN_WIDTHS = {FastSerializer.VOLTTYPE_TINYINT: 1,
+                     FastSerializer.VOLTTYPE_SMALLINT: 2,
+                     FastSerializer.VOLTTYPE_INTEGER: 4,
+                     FastSerializer.VOLTTYPE_BIGINT: 8,
+                     FastSerializer.VOLTTYPE_FLOAT: 8,
+                     FastSerializer.VOLTTYPE_TIMESTAMP: 8,
+                     FastSerializer.VOLTTYPE_DECIMAL: 16,
+                     FastSerializer.VOLTTYPE_GEOGRAPHY_POINT: 16}
+
     def __init__(self, fser):
         self.fser = fser
         self.columns = []  # column definitions
         self.tuples = []
+        # builds a row of the fser.row_type from a list, None for lists
+        self.__make_row = None
+        # for TABLE_COLUMNAR, one numpy array and one null mask per column
+        self.arrays = None
+        self.nulls = None
+        # for TABLE_LAZY, the offset of each row in the response, and a
+        # serializer reading the response
+        self.__rows = None
+        self.__decoder = None
+        # for a streamed table, the number of rows and of rows not read yet
+        self.__rowcount = None
+        self.__unread = None
+
+    # In TABLE_COLUMNAR and TABLE_LAZY modes the rows are only built if
+    # tuples is used
+    @property
+    def tuples(self):
+        if self._tuples is None:
+            if self.arrays is not None:
+                self._tuples = self.__rowsFromArrays()
+            else:
+                self._tuples = [self.row(i) for i in range(len(self.__rows))]
+        return self._tuples
+
+    @tuples.setter
+    def tuples(self, tuples):
+        self._tuples = tuples
 
     def __str__(self):
         result = ""
@@ -1719,12 +3162,126 @@ class VoltTable:
 
         return result
 
+    @staticmethod
+    @functools.lru_cache(maxsize = 256)
+    def row_class(names):
+        """The named tuple class of the rows of tables with the column names
+        names (a tuple). Names which are not valid field names are replaced
+        by the position of the column, prefixed with an underscore.
+        """
+
+        return collections.namedtuple("Row", names, rename = True)
+
+    def __rowMaker(self):
+        row_type = self.fser.row_type
+        if row_type == FastSerializer.ROW_TUPLE:
+            return tuple
+        if row_type == FastSerializer.ROW_NAMEDTUPLE:
+            return self.row_class(tuple(column.name or "" for column in self.columns))._make
+        return None
+
     def __getstate__(self):
-        return (self.columns, self.tuples)
+        # named tuple classes are built at run time and can not be pickled,
+        # their rows are pickled as tuples
+        tuples = self.tuples
+        if self.__make_row not in (None, tuple):
+            return (self.columns, [tuple(row) for row in tuples], FastSerializer.ROW_NAMEDTUPLE)
+        return (self.columns, tuples)
 
     def __setstate__(self, state):
         self.fser = None
-        self.columns, self.tuples = state
+        self.arrays = self.nulls = None
+        self.__rows = self.__decoder = None
+        self.__rowcount = self.__unread = None
+        self.__make_row = None
+        self.columns, self.tuples = state[:2]
+        if len(state) > 2:
+            make_row = self.row_class(tuple(column.name or "" for column in self.columns))._make
+            self.__make_row = make_row
+            self.tuples = [make_row(row) for row in self.tuples]
+
+    def row_count(self):
+        if self.__rowcount is not None:
+            return self.__rowcount
+        if self.__rows is not None:
+            return len(self.__rows)
+        if self.arrays is not None:
+            return len(self.arrays[0]) if self.arrays else 0
+        return len(self.tuples)
+
+    def row(self, index):
+        """The values of the row at index, as a list."""
+
+        if self.__rows is None:
+            return self.tuples[index]
+        decoder = self.__decoder
+        decoder.read_buffer._off = self.__rows[index]
+        row = [decoder.read(column.type) for column in self.columns]
+        return row if self.__make_row is None else self.__make_row(row)
+
+    def cell(self, index, column):
+        """The value of column (index or name) in the row at index."""
+
+        if not isinstance(column, int):
+            column = self.column_index(column)
+        if self.__rows is None:
+            return self.tuples[index][column]
+        decoder = self.__decoder
+        self.__seek(self.__rows[index], column)
+        return decoder.read(self.columns[column].type)
+
+    def iter_rows(self):
+        """Yields the rows of the table. For a table of a streamed response,
+        each row is read from the connection as it is needed, and the rows
+        can only be iterated over once.
+        """
+
+        if self.__unread is None:
+            for i in range(self.row_count()):
+                yield self.row(i)
+            return
+        fser = self.fser
+        types = [column.type for column in self.columns]
+        make_row = self.__make_row
+        while self.__unread > 0:
+            self.__unread -= 1
+            fser.readInt32()  # row size
+            row = [fser.read(type) for type in types]
+            yield row if make_row is None else make_row(row)
+
+    def skip_rows(self):
+        """Skips the rows of a streamed table which have not been read."""
+
+        fser = self.fser
+        while self.__unread:
+            self.__unread -= 1
+            fser.read_buffer.take(fser.readInt32())
+
+    def column_index(self, name):
+        for i, column in enumerate(self.columns):
+            if column.name == name:
+                return i
+        raise KeyError(name)
+
+    # Moves the decoder to column of the row starting at offset. The offset of
+    # the columns before the first variable width one is the same in all
+    # rows; after it, the columns have to be skipped one by one.
+    def __seek(self, offset, column):
+        decoder = self.__decoder
+        fixed = self.__fixed
+        if column < len(fixed):
+            decoder.read_buffer._off = offset + fixed[column]
+            return
+        offset += fixed[-1]
+        unpack = decoder.int32Struct.unpack_from
+        data = decoder.read_buffer.get_buffer()
+        for i in range(len(fixed) - 1, column):
+            width = self.COLUMN_WIDTHS.get(self.columns[i].type)
+            if width is None:
+                # string, varbinary or geography: length prefixed, -1 if null
+                width = 4 + max(unpack(data, offset)[0], 0)
+            offset += width
+        decoder.read_buffer._off = offset
 
     def __eq__(self, other):
         if len(self.tuples) > 0:
@@ -1747,24 +3304,23 @@ class VoltTable:
         # 1.
         tablesize = self.fser.readInt32()
         limit_position = self.fser.read_buffer._off + tablesize
-        # 2.
-        headersize = self.fser.readInt32()
-        statuscode = self.fser.readByte()
-        columncount = self.fser.readInt16()
-        for i in range(columncount):
-            column = VoltColumn(fser = self.fser)
-            self.columns.append(column)
-        list([x.readName(self.fser) for x in self.columns])
-
-        # 3.
-        rowcount = self.fser.readInt32()
+        # 2. and 3.a
+        rowcount = self.__readHeader()
+        columncount = len(self.columns)
+        if self.fser.table_mode == FastSerializer.TABLE_COLUMNAR:
+            self.__readColumns(rowcount, limit_position)
+            return self
+        if self.fser.table_mode == FastSerializer.TABLE_LAZY:
+            self.__readRowOffsets(rowcount, limit_position)
+            return self
+        make_row = self.__make_row
         for i in range(rowcount):
             rowsize = self.fser.readInt32()
             # list comprehension: build list by calling read for each column in
             # row/tuple
             row = [self.fser.read(self.columns[j].type)
                    for j in range(columncount)]
-            self.tuples.append(row)
+            self.tuples.append(row if make_row is None else make_row(row))
 
         # advance offset to end of table-size on read_buffer
         if self.fser.read_buffer._off != limit_position:
@@ -1772,32 +3328,181 @@ class VoltTable:
 
         return self
 
-    def writeToSerializer(self):
-        table_fser = FastSerializer()
-
-        # We have to pack the header into a buffer first so that we can
-        # calculate the size
-        header_fser = FastSerializer()
-
-        header_fser.writeByte(0)
-        header_fser.writeInt16(len(self.columns))
-        list([x.writeType(header_fser) for x in self.columns])
-        list([x.writeName(header_fser) for x in self.columns])
-
-        table_fser.writeInt32(header_fser.size() - 4)
-        table_fser.writeRawBytes(header_fser.getRawBytes())
-
-        table_fser.writeInt32(len(self.tuples))
-        for i in self.tuples:
-            row_fser = FastSerializer()
-
-            list([row_fser.write(self.columns[x].type, i[x]) for x in range(len(i))])
-
-            table_fser.writeInt32(row_fser.size())
-            table_fser.writeRawBytes(row_fser.getRawBytes())
+    def readHeaderFromSerializer(self):
+        # as readFromSerializer(), for a streamed response: the rows are read
+        # by iter_rows()
+        tablesize = self.fser.readInt32()
+        self.__rowcount = self.__unread = self.__readHeader()
+        self._tuples = []
+        return self
 
-        table_fser.prependLength()
-        self.fser.writeRawBytes(table_fser.getRawBytes())
+    def __readHeader(self):
+        headersize = self.fser.readInt32()
+        statuscode = self.fser.readByte()
+        columncount = self.fser.readInt16()
+        for i in range(columncount):
+            column = VoltColumn(fser = self.fser)
+            self.columns.append(column)
+        list([x.readName(self.fser) for x in self.columns])
+        self.__make_row = self.__rowMaker()
+        return self.fser.readInt32()
+
+    # Columnar decoding. Numeric columns are gathered for all rows at once,
+    # through a strided view when every column is fixed width (the rows then
+    # have a constant size), otherwise from the offsets of the column in
+    # each row; decimal and geography point columns are gathered the same
+    # way and converted in one pass. Other columns are read cell by cell with the usual readers,
+    # which also gives the offsets of the next column.
+    def __readColumns(self, rowcount, limit_position):
+        read_buffer = self.fser.read_buffer
+        data = read_buffer.get_buffer()
+        raw = numpy.frombuffer(data, dtype=numpy.uint8)
+        types = [c.type for c in self.columns]
+        widths = [self.COLUMN_WIDTHS.get(t) for t in types]
+
+        # 1. offset of the first column of each row
+        if None not in widths:
+            stride = 4 + sum(widths)
+            starts = read_buffer._off + 4 + stride * numpy.arange(rowcount, dtype=numpy.int64)
+        else:
+            stride = None
+            starts = numpy.empty(rowcount, dtype=numpy.int64)
+            offset = read_buffer._off
+            unpack = self.fser.int32Struct.unpack_from
+            for i in range(rowcount):
+                starts[i] = offset + 4
+                offset += 4 + unpack(data, offset)[0]
+
+        # 2. read the columns in order
+        self.arrays = []
+        self.nulls = []
+        offsets = starts
+        for type, width in zip(types, widths):
+            if type in self.COLUMN_DTYPES:
+                dtype = numpy.dtype(self.COLUMN_DTYPES[type])
+                if rowcount == 0:
+                    values = numpy.empty(0, dtype=dtype)
+                elif stride is not None:
+                    values = numpy.ndarray((rowcount,), dtype=dtype, buffer=data,
+                                           offset=int(offsets[0]), strides=(stride,))
+                else:
+                    values = raw[offsets[:, None] + numpy.arange(width)].view(dtype).ravel()
+                # copy out of the read buffer, in native byte order
+                values = values.astype(dtype.newbyteorder('='))
+                if type == FastSerializer.VOLTTYPE_FLOAT:
+                    nulls = numpy.abs(values - FastSerializer.NULL_FLOAT_INDICATOR) < 1e307
+                else:
+                    nulls = values == self.NULL_INDICATORS[type]
+                if (type == FastSerializer.VOLTTYPE_TIMESTAMP and
+                    self.fser.timestamp_mode == FastSerializer.TIMESTAMP_DATETIME64):
+                    # NULL, the smallest int64, is NaT
+                    values = values.view('datetime64[us]')
+                offsets = offsets + width
+            elif type == FastSerializer.VOLTTYPE_DECIMAL:
+                cells = raw[offsets[:, None] + numpy.arange(width)].tobytes()
+                values = numpy.empty(rowcount, dtype=object)
+                values[:] = self.fser.decimalsFromBytes(cells)
+                nulls = numpy.equal(values, None)
+                offsets = offsets + width
+            elif type == FastSerializer.VOLTTYPE_GEOGRAPHY_POINT:
+                cells = raw[offsets[:, None] + numpy.arange(width)]
+                values = cells.view('>f8').reshape(rowcount, 2).astype(float)
+                nulls = (values == Geography.NULL_COORD).all(axis=1)
+                offsets = offsets + width
+            else:
+                values = numpy.empty(rowcount, dtype=object)
+                next_offsets = numpy.empty(rowcount, dtype=numpy.int64)
+                for i in range(rowcount):
+                    read_buffer._off = int(offsets[i])
+                    values[i] = self.fser.read(type)
+                    next_offsets[i] = read_buffer._off
+                nulls = numpy.equal(values, None)
+                offsets = next_offsets
+            self.arrays.append(values)
+            self.nulls.append(nulls)
+
+        read_buffer._off = limit_position
+        self._tuples = None
+
+    # Lazy decoding. Only the offset of each row is recorded, from the row
+    # sizes; the response is detached from the read buffer and kept for the
+    # values to be read when they are asked for.
+    def __readRowOffsets(self, rowcount, limit_position):
+        read_buffer = self.fser.read_buffer
+        data = read_buffer.detach()
+        rows = array.array('q')
+        offset = read_buffer._off
+        unpack = self.fser.int32Struct.unpack_from
+        for i in range(rowcount):
+            rows.append(offset + 4)
+            offset += 4 + unpack(data, offset)[0]
+        if offset != limit_position:
+            raise IOError("Table rows do not match the table size")
+        read_buffer._off = limit_position
+
+        # offsets of the columns up to the first variable width one
+        fixed = [0]
+        for column in self.columns:
+            width = self.COLUMN_WIDTHS.get(column.type)
+            if width is None:
+                break
+            fixed.append(fixed[-1] + width)
+
+        self.__rows = rows
+        self.__fixed = fixed
+        self.__decoder = FastSerializer(timestamp_mode = self.fser.timestamp_mode)
+        self.__decoder.read_buffer.wrap(data)
+        self._tuples = None
+
+    def __rowsFromArrays(self):
+        columns = []
+        for column, values, nulls in zip(self.columns, self.arrays, self.nulls):
+            if values.dtype.kind == 'M':
+                values = values.view(numpy.int64)
+            values = values.tolist()
+            if column.type == FastSerializer.VOLTTYPE_GEOGRAPHY_POINT:
+                values = [tuple(point) for point in values]
+            if nulls.any():
+                for i in numpy.flatnonzero(nulls).tolist():
+                    values[i] = None
+            if column.type == FastSerializer.VOLTTYPE_TIMESTAMP:
+                values = [None if v is None else self.fser.dateFromMicroseconds(v)
+                          for v in values]
+            columns.append(values)
+        make_row = self.__make_row or list
+        return [make_row(row) for row in zip(*columns)]
+
+    # The table is written straight into the write buffer of fser (self.fser
+    # by default). The sizes of the table, header and rows are written as 0
+    # and filled in once what they measure has been written.
+    def writeToSerializer(self, fser = None):
+        if fser is None:
+            fser = self.fser
+        wbuf = fser.wbuf
+        size = WriteBuffer.LENGTH
+
+        table_position = wbuf.tell()
+        fser.writeInt32(0)
+        header_position = wbuf.tell()
+        fser.writeInt32(0)
+        fser.writeByte(0)
+        fser.writeInt16(len(self.columns))
+        list([x.writeType(fser) for x in self.columns])
+        list([x.writeName(fser) for x in self.columns])
+        wbuf.pack_at(size, header_position, wbuf.tell() - header_position - 4)
+
+        tuples = self.tuples
+        fser.writeInt32(len(tuples))
+        types = [x.type for x in self.columns]
+        write = fser.write
+        for row in tuples:
+            row_position = wbuf.tell()
+            fser.writeInt32(0)
+            for type, value in zip(types, row):
+                write(type, value)
+            wbuf.pack_at(size, row_position, wbuf.tell() - row_position - 4)
+
+        wbuf.pack_at(size, table_position, wbuf.tell() - table_position - 4)
 
 
 class VoltException:
@@ -1874,6 +3579,9 @@ class VoltException:
 
 class VoltResponse:
     "VoltDB called procedure response (ClientResponse.java)"
+
+    # status of responses made up by the client
+    CONNECTION_LOST = -4
     def __init__(self, fser):
         self.fser = fser
         self.version = -1
@@ -1885,6 +3593,7 @@ class VoltResponse:
         self.roundtripTime = -1
         self.exception = None
         self.tables = None
+        self.__stream = None  # (fser, table count) of a streamed response
 
         if fser != None:
             self.deserialize(fser)
@@ -1893,6 +3602,31 @@ class VoltResponse:
         # serialization order: response-length, status, roundtripTime, exception,
         # tables[], info, id.
         fser.bufferForRead()
+        if fser.tracer is None:
+            self.deserializeBuffered(fser)
+            return
+        received = time.perf_counter_ns()
+        self.deserializeBuffered(fser)
+        fser.trace_response(self, received)
+
+    def deserializeBuffered(self, fser):
+        # as deserialize(), for a response already in the read buffer
+        tablecount = self.__readHeader(fser)
+        self.tables = []
+        for i in range(tablecount):
+            table = VoltTable(fser)
+            self.tables.append(table.readFromSerializer())
+
+    def deserializeStreaming(self, fser):
+        # as deserialize(), up to the tables, which are read by iter_tables()
+        # while the rest of the response is received
+        fser.bufferForStreaming()
+        received = time.perf_counter_ns()
+        self.__stream = (fser, self.__readHeader(fser))
+        if fser.tracer is not None:
+            fser.trace_response(self, received)
+
+    def __readHeader(self, fser):
         self.version = fser.readByte()
         self.clientHandle = fser.readInt64()
         presentFields = fser.readByteRaw();
@@ -1913,11 +3647,47 @@ class VoltResponse:
             self.exception = None
 
         # tables[]
-        tablecount = fser.readInt16()
-        self.tables = []
+        return fser.readInt16()
+
+    def iter_tables(self):
+        """Yields the tables of the response. For a streamed response, each
+        table is yielded once its header is received, and its rows are read
+        with VoltTable.iter_rows(); rows which were not read are skipped when
+        the next table is read.
+        """
+
+        if self.__stream is None:
+            for table in self.tables or []:
+                yield table
+            return
+        (fser, tablecount), self.__stream = self.__stream, None
+        table = None
         for i in range(tablecount):
-            table = VoltTable(fser)
-            self.tables.append(table.readFromSerializer())
+            if table is not None:
+                table.skip_rows()
+            table = VoltTable(fser).readHeaderFromSerializer()
+            yield table
+        if table is not None:
+            table.skip_rows()
+        fser.endStreaming()
+
+    @staticmethod
+    def failed(statusString):
+        """Returns a response for an invocation that did not complete."""
+
+        res = VoltResponse(None)
+        res.statusString = statusString
+        return res
+
+    @staticmethod
+    def lost(statusString):
+        """As failed(), for an invocation whose connection was lost or
+        missing, which may or may not have been executed.
+        """
+
+        res = VoltResponse.failed(statusString)
+        res.status = VoltResponse.CONNECTION_LOST
+        return res
 
     def __str__(self):
         tablestr=""
@@ -1936,46 +3706,345 @@ class VoltResponse:
 
 class VoltProcedure:
     "VoltDB called procedure interface"
+
+    # struct codes and NULL values of the types the compiled encoder packs
+    # together
+    FIXED_WIDTH_CODES = {FastSerializer.VOLTTYPE_TINYINT: ('b', FastSerializer.NULL_TINYINT_INDICATOR),
+                         FastSerializer.VOLTTYPE_SMALLINT: ('h', FastSerializer.NULL_SMALLINT_INDICATOR),
+                         FastSerializer.VOLTTYPE_INTEGER: ('i', FastSerializer.NULL_INTEGER_INDICATOR),
+                         FastSerializer.VOLTTYPE_BIGINT: ('q', FastSerializer.NULL_BIGINT_INDICATOR),
+                         FastSerializer.VOLTTYPE_FLOAT: ('d', FastSerializer.NULL_FLOAT_INDICATOR)}
+
     def __init__(self, fser, name, paramtypes = []):
-        self.fser = fser             # FastSerializer object
+        self.fser = fser             # FastSerializer or VoltClient object
         self.name = name             # procedure class name
         self.paramtypes = paramtypes # list of fser.WIRE_* values
+        self.__encoder = None        # (name, paramtypes, steps) of the compiled encoder
+
+    # The compiled encoder is a list of steps. A step packs, with a single
+    # struct, a run of parameters of fixed width types, and the header of
+    # the invocation for the first step. Other parameters have a step of
+    # their own, written by the generic writers. A step is (packer,
+    # template, start, getter, nulls) for a run, where template holds the
+    # struct arguments with the type bytes, the values of the parameters,
+    # given by getter, going to every other argument from start; and
+    # (None, paramtype, index) for a single parameter.
+    def __compile(self):
+        name = self.name.encode("utf-8")
+        steps = []
+        codes = ['%ds' % (5 + len(name)), 'q', 'h']
+        template = [struct.pack('>bi', 0, len(name)) + name, 0, len(self.paramtypes)]
+        indexes = []
+        nulls = []
+        for index, paramtype in enumerate(self.paramtypes):
+            if paramtype in self.FIXED_WIDTH_CODES:
+                code, null = self.FIXED_WIDTH_CODES[paramtype]
+                codes += ['b', code]
+                template += [paramtype, null]
+                indexes.append(index)
+                nulls.append(null)
+                continue
+            if codes:
+                steps.append(self.__run(codes, template, indexes, nulls))
+                codes, template, indexes, nulls = [], [], [], []
+            steps.append((None, paramtype, index))
+        if codes:
+            steps.append(self.__run(codes, template, indexes, nulls))
+        return steps
+
+    def __run(self, codes, template, indexes, nulls):
+        if len(indexes) == 0:
+            getter = None
+        elif len(indexes) == 1:
+            getter = lambda params, index = indexes[0]: (params[index],)
+        else:
+            getter = operator.itemgetter(*indexes)
+        start = len(template) - 2 * len(indexes) + 1
+        return (struct.Struct('>' + ''.join(codes)), template, start, getter, nulls)
+
+    def __encode(self, fser, steps, params, handle):
+        wbuf = fser.wbuf
+        for step in steps:
+            if step[0] is None:
+                self.__writeParam(fser, step[1], params[step[2]])
+                continue
+            packer, template, start, getter, nulls = step
+            args = list(template)
+            if step is steps[0]:
+                args[1] = handle
+            if getter is not None:
+                values = getter(params)
+                if None in values:
+                    values = [null if value is None else value for value, null in zip(values, nulls)]
+                args[start::2] = values
+            wbuf.pack_into(packer, *args)
+
+    def __writeParam(self, fser, paramtype, param):
+        if self.as_array(paramtype, param):
+            fser.writeByte(FastSerializer.ARRAY)
+            fser.writeByte(paramtype)
+            fser.writeArray(paramtype, param)
+        else:
+            fser.writeWireType(paramtype, param)
 
-    def call(self, params = None, response = True, timeout = None):
-        self.fser.writeByte(0)  # version number
-        self.fser.writeString(self.name)
-        self.fser.writeInt64(1)            # client handle
-        self.fser.writeInt16(len(self.paramtypes))
+    def writeInvocation(self, fser, params, handle):
+        """Serializes an invocation into the write buffer of fser, the
+        connection it will be sent on, including the length prefix.
+        """
+
+        if fser.stats is None and fser.tracer is None:
+            self.__writeInvocation(fser, params, handle)
+            return
+        start = time.perf_counter_ns()
+        position = fser.wbuf.tell()
+        self.__writeInvocation(fser, params, handle)
+        fser.record_invocation(handle, self.name, fser.wbuf.tell() - position, start)
+
+    def __writeInvocation(self, fser, params, handle):
+        # the compiled encoder packs floats in network order, which is the
+        # input byte order unless changed by setInputByteOrder()
+        encoder = self.__encoder
+        if encoder is None or encoder[0] != self.name or encoder[1] != self.paramtypes:
+            encoder = self.__encoder = (self.name, list(self.paramtypes), self.__compile())
+        if fser.inputBOM == FastSerializer.BIG_ENDIAN:
+            position = fser.wbuf.tell()
+            try:
+                self.__encode(fser, encoder[2], params, handle)
+                fser.prependLength()
+                return
+            except (struct.error, TypeError, IndexError):
+                # e.g. an array or a value of another type for a fixed width
+                # parameter, written by the generic writers
+                fser.wbuf.truncate(position)
+
+        fser.writeByte(0)  # version number
+        fser.writeString(self.name)
+        fser.writeInt64(handle)       # client handle
+        fser.writeInt16(len(self.paramtypes))
         for i in range(len(self.paramtypes)):
-            if self.as_array(self.paramtypes[i], params[i]):
-                self.fser.writeByte(FastSerializer.ARRAY)
-                self.fser.writeByte(self.paramtypes[i])
-                self.fser.writeArray(self.paramtypes[i], params[i])
-            else:
-                self.fser.writeWireType(self.paramtypes[i], params[i])
-        self.fser.prependLength() # prepend the total length of the invocation
-        self.fser.flush()
+            self.__writeParam(fser, self.paramtypes[i], params[i])
+        fser.prependLength() # prepend the total length of the invocation
 
+    def call(self, params = None, response = True, timeout = None):
         # The timeout in effect for the procedure call is the timeout argument
         # if not None or self.procedure_timeout. Exceeding that time will raise
         # a timeout exception. Restores the original timeout value when done.
         # This default argument usage does not allow overriding with None.
         if timeout is None:
             timeout = self.fser.procedure_timeout
+
+        res = self.__retrying(self.__call, params, timeout)
+        return response and res or None
+
+    def __retrying(self, call, params, timeout):
+        res = call(params, timeout)
+
+        # With a retry policy, a lost connection is replaced, and the call is
+        # sent again if that is harmless
+        policy = self.fser.retry_policy
+        if policy is not None:
+            retryable = policy.retryable(self.fser, self.name)
+            retries = 0
+            while res.status == VoltResponse.CONNECTION_LOST and self.fser.recover():
+                if not retryable or retries == policy.retries:
+                    break
+                retries += 1
+                res = call(params, timeout)
+        return res
+
+    def __call(self, params, timeout):
+        if self.fser.is_pipelined():
+            # other invocations may be outstanding on this connection, the
+            # response is delivered by the reader thread
+            future = self.call_async(params)
+            try:
+                return future.result(timeout)
+            except futures.TimeoutError:
+                self.fser.cancel(future)
+                return VoltResponse.failed("timeout: procedure call took longer than %d seconds" % timeout)
+
+        handle = next(self.fser.handles)
+        self.writeInvocation(self.fser, params, handle)
+        try:
+            self.fser.flush()
+        except IOError as err:
+            res = VoltResponse.lost(str(err))
+            self.fser.record_response(res, handle)
+            return res
+
         original_timeout = self.fser.socket.gettimeout()
         self.fser.socket.settimeout(timeout)
         try:
             try:
                 res = VoltResponse(self.fser)
+                # the late responses of calls which timed out before are
+                # received first, they are discarded
+                while res.clientHandle != handle:
+                    res = VoltResponse(self.fser)
             except socket.timeout:
                 res = VoltResponse(None)
                 res.statusString = "timeout: procedure call took longer than %d seconds" % timeout
+                self.fser.record_timeout(handle)
             except IOError as err:
-                res = VoltResponse(None)
-                res.statusString = str(err)
+                res = VoltResponse.lost(str(err))
         finally:
             self.fser.socket.settimeout(original_timeout)
-        return response and res or None
+        self.fser.record_response(res, handle)
+        return res
+
+    def call_many(self, param_rows, response = True, timeout = None):
+        """Invokes the procedure once per list of parameters in param_rows.
+        The invocations are written back to back and sent with a single
+        write per FastSerializer.BATCH_FLUSH_SIZE bytes. Returns the list of
+        VoltResponse objects in the order of param_rows, or None if response
+        is False. The timeout applies to each response. After a timeout or
+        a lost connection, the rows left are not sent, their responses
+        report the failure. If an invocation can not be serialized, the
+        ones before it are sent, and the error is raised with their
+        responses as its responses attribute (None for invocations which
+        were not sent).
+        """
+
+        if timeout is None:
+            timeout = self.fser.procedure_timeout
+        timeout_message = "timeout: procedure call took longer than %d seconds" % (timeout or 0)
+
+        if self.fser.is_pipelined():
+            def result(future):
+                if future is None:
+                    return None
+                try:
+                    return future.result(timeout)
+                except futures.TimeoutError:
+                    self.fser.cancel(future)
+                    return VoltResponse.failed(timeout_message)
+            try:
+                pending = self.fser.invoke_many(self, param_rows)
+            except Exception as e:
+                if hasattr(e, "futures"):
+                    e.responses = [result(future) for future in e.futures]
+                raise
+            results = [result(future) for future in pending]
+            return results if response else None
+
+        fser = self.fser
+        results = []
+        # after a timeout or a lost connection, (VoltResponse.failed or
+        # VoltResponse.lost, message) for the rows not sent
+        failure = None
+        original_timeout = fser.socket.gettimeout()
+        fser.socket.settimeout(timeout)
+        try:
+            rows = iter(param_rows)
+            while failure is None:
+                # write invocations until the batch is large enough, send
+                # them, and read their responses
+                handles = {}
+                invalid = None  # error serializing the row after the batch
+                for params in rows:
+                    handle = next(fser.handles)
+                    position = fser.wbuf.tell()
+                    try:
+                        self.writeInvocation(fser, params, handle)
+                    except Exception as e:
+                        # drop what was written of it, the batch before it
+                        # is sent
+                        fser.wbuf.truncate(position)
+                        invalid = e
+                        break
+                    handles[handle] = len(handles)
+                    if fser.wbuf.size() >= fser.BATCH_FLUSH_SIZE:
+                        break
+                if not handles and invalid is None:
+                    break
+                batch = [None] * len(handles)
+                try:
+                    if handles:
+                        fser.flush()
+                    received = 0
+                    while received < len(handles):
+                        res = VoltResponse(fser)
+                        i = handles.get(res.clientHandle)
+                        if i is None:
+                            # the late response of a call which timed out before
+                            continue
+                        batch[i] = res
+                        received += 1
+                        fser.record_response(res)
+                except socket.timeout:
+                    failure = (VoltResponse.failed, timeout_message)
+                except IOError as err:
+                    failure = (VoltResponse.lost, str(err))
+                if failure is not None:
+                    batch = [res or failure[0](failure[1]) for res in batch]
+                    for handle, i in handles.items():
+                        if failure[0] is VoltResponse.failed:
+                            fser.record_timeout(handle)
+                        else:
+                            fser.record_response(batch[i], handle)
+                results.extend(batch)
+                if invalid is not None:
+                    invalid.responses = results
+                    raise invalid
+            if failure is not None:
+                # the responses of the batch may still be on their way, the
+                # rows left are not sent
+                results.extend(failure[0](failure[1]) for params in rows)
+        finally:
+            fser.socket.settimeout(original_timeout)
+        return results if response else None
+
+    def call_streaming(self, params = None, timeout = None):
+        """As call(), but returns the response once its header is received.
+        The tables and rows are then received from the connection as they are
+        read with VoltResponse.iter_tables() and VoltTable.iter_rows(), so a
+        large result does not have to fit in memory. The timeout only applies
+        to the response header. Not available on connections with
+        asynchronous calls.
+        """
+
+        if timeout is None:
+            timeout = self.fser.procedure_timeout
+        if self.fser.is_pipelined():
+            raise RuntimeError("Responses can not be streamed from a connection with asynchronous calls")
+        return self.__retrying(self.__call_streaming, params, timeout)
+
+    def __call_streaming(self, params, timeout):
+        handle = next(self.fser.handles)
+        self.writeInvocation(self.fser, params, handle)
+        try:
+            self.fser.flush()
+        except IOError as err:
+            res = VoltResponse.lost(str(err))
+            self.fser.record_response(res, handle)
+            return res
+
+        res = VoltResponse(None)
+        original_timeout = self.fser.socket.gettimeout()
+        self.fser.socket.settimeout(timeout)
+        try:
+            try:
+                res.deserializeStreaming(self.fser)
+            except socket.timeout:
+                res.statusString = "timeout: procedure call took longer than %d seconds" % timeout
+                self.fser.record_timeout(handle)
+            except IOError as err:
+                res = VoltResponse.lost(str(err))
+        finally:
+            self.fser.socket.settimeout(original_timeout)
+        # the response is counted whole, from its length, once its header is
+        # received
+        self.fser.record_response(res, handle)
+        return res
+
+    def call_async(self, params = None, callback = None):
+        """Sends the invocation without waiting for the response, so that
+        many invocations can be outstanding on one connection. Returns a
+        concurrent.futures.Future for the VoltResponse; callback, if given,
+        is called with the VoltResponse when it arrives.
+        """
+
+        return self.fser.invoke(self, params, callback)
 
     def as_array(self, paramtype, param):
         try:
@@ -1988,6 +4057,896 @@ class VoltProcedure:
         except TypeError:
             return False
 
+def murmur3_token(data):
+    """Returns the token for data, a bytes-like object, as computed by the
+    server: the low 32 bits of the first half of its 128-bit x64 MurmurHash3
+    with seed 0, as a signed integer.
+    """
+
+    mask = 0xffffffffffffffff
+    c1 = 0x87c37b91114253d5
+    c2 = 0x4cf5ad432745937f
+
+    def rotl(x, r):
+        return ((x << r) | (x >> (64 - r))) & mask
+
+    def fmix(k):
+        k ^= k >> 33
+        k = (k * 0xff51afd7ed558ccd) & mask
+        k ^= k >> 33
+        k = (k * 0xc4ceb9fe1a85ec53) & mask
+        return k ^ (k >> 33)
+
+    length = len(data)
+    nblocks = length // 16
+    h1 = h2 = 0
+    for i in range(nblocks):
+        k1, k2 = struct.unpack_from('<QQ', data, i * 16)
+        h1 ^= (rotl((k1 * c1) & mask, 31) * c2) & mask
+        h1 = (((rotl(h1, 27) + h2) & mask) * 5 + 0x52dce729) & mask
+        h2 ^= (rotl((k2 * c2) & mask, 33) * c1) & mask
+        h2 = (((rotl(h2, 31) + h1) & mask) * 5 + 0x38495ab5) & mask
+
+    tail = bytes(data[nblocks * 16:])
+    if len(tail) > 8:
+        k2 = int.from_bytes(tail[8:], 'little')
+        h2 ^= (rotl((k2 * c2) & mask, 33) * c1) & mask
+    if len(tail) > 0:
+        k1 = int.from_bytes(tail[:8], 'little')
+        h1 ^= (rotl((k1 * c1) & mask, 31) * c2) & mask
+
+    h1 ^= length
+    h2 ^= length
+    h1 = (h1 + h2) & mask
+    h2 = (h2 + h1) & mask
+    h1 = fmix(h1)
+    h2 = fmix(h2)
+    h1 = (h1 + h2) & mask
+
+    token = h1 & 0xffffffff
+    return token - 0x100000000 if token & 0x80000000 else token
+
+class Hashinator:
+    """
+    Client side copy of the server's elastic hashinator, which maps
+    partitioning values to partitions through a ring of tokens.
+    """
+
+    INTEGER_TYPES = (FastSerializer.VOLTTYPE_TINYINT,
+                     FastSerializer.VOLTTYPE_SMALLINT,
+                     FastSerializer.VOLTTYPE_INTEGER,
+                     FastSerializer.VOLTTYPE_BIGINT)
+
+    def __init__(self, hashtype, config):
+        """
+        :param hashtype: hashinator type, only "ELASTIC" is supported
+        :param config: hashinator configuration as returned by @Statistics TOPO
+        """
+        if hashtype != "ELASTIC":
+            raise ValueError("Unsupported hashinator type %s" % hashtype)
+        config = bytes(config)
+        count = struct.unpack_from('>i', config, 0)[0]
+        pairs = sorted(struct.unpack_from('>ii', config, 4 + 8 * i) for i in range(count))
+        self.tokens = [t for t, p in pairs]
+        self.partitions = [p for t, p in pairs]
+
+    def partition_for_token(self, token):
+        # the partition of the nearest token at or below, wrapping around
+        return self.partitions[bisect.bisect_right(self.tokens, token) - 1]
+
+    def partition_for_value(self, paramtype, value):
+        """Returns the partition for value of the given VoltDB type, or None
+        if values of that type are not used for partitioning.
+        """
+
+        if paramtype not in self.INTEGER_TYPES and \
+                paramtype not in (FastSerializer.VOLTTYPE_STRING, FastSerializer.VOLTTYPE_VARBINARY):
+            return None
+        key = self.partition_key(paramtype, value)
+        if key is None:
+            return 0
+        return self.partition_for_token(murmur3_token(key))
+
+    @classmethod
+    def partition_key(cls, paramtype, value):
+        """Returns the bytes hashed for value of the given VoltDB type: a
+        little-endian 64-bit integer, UTF-8 text or the bytes themselves. None
+        for NULL, which is in partition 0.
+        """
+
+        if value is None:
+            return None
+        if paramtype in cls.INTEGER_TYPES:
+            value = int(value)
+            if value == FastSerializer.NULL_BIGINT_INDICATOR:
+                return None
+            return struct.pack('<q', value)
+        if paramtype == FastSerializer.VOLTTYPE_STRING:
+            return str(value).encode("utf-8")
+        return bytes(value)
+
+class VoltClient:
+    """Pool of connections to the servers of a cluster, one per server.
+
+    A VoltClient can be passed to VoltProcedure in place of a FastSerializer.
+    Invocations of single-partition procedures are sent to the server which
+    leads the partition, if it is connected (client affinity). Others are
+    sent on the connection with the fewest outstanding requests.
+    Connections that fail are dropped from the pool, and a background
+    thread tries to reconnect to their servers every recovery_interval
+    seconds, or with a retry_policy, after the delays of the policy.
+    """
+
+    MP_PARTITION = 16383
+
+    def __init__(self, servers, port = 21212, recovery_interval = 5, affinity = True,
+                 retry_policy = None, **kwargs):
+        """
+        :param servers: list of "host" or "host:port" strings, or a comma separated string of them
+        :param port: port for servers which do not specify one
+        :param recovery_interval: seconds between attempts to reconnect to failed servers
+        :param affinity: route single-partition invocations to the partition leader
+        :param retry_policy: RetryPolicy for reconnecting to failed servers and retrying calls, or None
+        :param kwargs: connection options passed to FastSerializer, e.g. username, password, usessl, stats, tracer
+        """
+        if isinstance(servers, str):
+            servers = servers.split(",")
+        self.servers = []
+        for server in servers:
+            server = server.strip()
+            if server.count(":") == 1:
+                host, server_port = server.split(":")
+                self.servers.append((host, int(server_port)))
+            else:
+                self.servers.append((server, port))
+        self.recovery_interval = recovery_interval
+        self.retry_policy = retry_policy
+        self.recovery_attempts = 0  # reconnection passes since all servers were up
+        self.recovery_lock = threading.Lock()
+        self.options = kwargs
+        self.procedure_timeout = kwargs.get("procedure_timeout")
+        self.stats = kwargs.get("stats")
+        self.connections = []   # live connections
+        self.down = []          # (host, port) of servers not connected
+        self.lock = threading.RLock()
+        self.rotation = 0
+
+        # client affinity
+        self.affinity = affinity
+        self.hashinator = None
+        self.partition_leaders = {}  # partition id -> host id
+        self.procedures = {}         # procedure name -> catalog info
+
+        for server in self.servers:
+            try:
+                self.connections.append(self.__connect(server))
+            except Exception as e:
+                error("ERROR: Unable to connect to %s:%s: %s" % (server[0], server[1], e))
+                self.down.append(server)
+        if not self.connections:
+            raise IOError("Unable to connect to any server")
+        self.refresh_topology()
+
+        self.closing = threading.Event()
+        self.monitor = threading.Thread(target=self.__monitor, name="voltdbclient-monitor")
+        self.monitor.daemon = True
+        self.monitor.start()
+
+    def __connect(self, server):
+        fser = FastSerializer(server[0], server[1], **self.options)
+        fser.start_reader()
+        return fser
+
+    def __monitor(self):
+        while not self.closing.wait(self.__monitor_delay()):
+            changed = self.__drop_failed()
+            changed = self.__reconnect() or changed
+            if changed or self.topology_failed:
+                # partition leadership moves when servers fail or rejoin
+                self.refresh_topology()
+
+    def __monitor_delay(self):
+        if self.retry_policy is None or not self.down:
+            return self.recovery_interval
+        return self.retry_policy.delay(self.recovery_attempts)
+
+    def __reconnect(self):
+        # one attempt to reconnect to each server which is down, by the
+        # monitor or by recover()
+        changed = False
+        with self.recovery_lock:
+            for server in list(self.down):
+                if self.closing.is_set():
+                    break
+                try:
+                    fser = self.__connect(server)
+                except Exception:
+                    continue
+                with self.lock:
+                    self.down.remove(server)
+                    self.connections.append(fser)
+                changed = True
+            self.recovery_attempts = self.recovery_attempts + 1 if self.down else 0
+        return changed
+
+    def recover(self):
+        """Called by VoltProcedure.call() after a connection was lost:
+        returns True at once if other connections are live, otherwise
+        attempts to reconnect to the servers, as the retry_policy allows.
+        """
+
+        policy = self.retry_policy
+        if policy is None:
+            return False
+        self.__drop_failed()
+        with self.lock:
+            if self.connections:
+                return True
+        for attempt in range(policy.retries):
+            time.sleep(policy.delay(attempt))
+            self.__reconnect()
+            with self.lock:
+                if self.connections:
+                    return True
+        return False
+
+    def is_read_only(self, name):
+        """Returns whether the procedure name is known not to modify data,
+        from the catalog fetched by refresh_topology().
+        """
+
+        info = self.procedures.get(name)
+        if info is not None:
+            return bool(info.get("readOnly"))
+        return name in RetryPolicy.READ_ONLY_PROCEDURES
+
+    def refresh_topology(self):
+        """Fetches the partition leaders, the hashinator and the procedure
+        partitioning from the cluster, for routing invocations. Call this
+        after procedures are added, dropped or repartitioned.
+        """
+
+        self.topology_failed = False
+        if not self.affinity:
+            return
+        try:
+            topo = VoltProcedure(self, "@Statistics",
+                                 [FastSerializer.VOLTTYPE_STRING,
+                                  FastSerializer.VOLTTYPE_TINYINT]).call(["TOPO", 0])
+            catalog = VoltProcedure(self, "@SystemCatalog",
+                                    [FastSerializer.VOLTTYPE_STRING]).call(["PROCEDURES"])
+            if topo.status != 1 or catalog.status != 1:
+                raise RuntimeError(topo.statusString if topo.status != 1 else catalog.statusString)
+
+            leaders = {}
+            for row in topo.tables[0].tuples:
+                if row[0] != self.MP_PARTITION:
+                    leaders[row[0]] = int(row[2].split(":")[0])
+            hashinator = Hashinator(topo.tables[1].tuples[0][0],
+                                    topo.tables[1].tuples[0][1])
+
+            procedures = {}
+            names = [c.name for c in catalog.tables[0].columns]
+            name_index = names.index("PROCEDURE_NAME")
+            remarks_index = names.index("REMARKS")
+            for row in catalog.tables[0].tuples:
+                try:
+                    procedures[row[name_index]] = json.loads(row[remarks_index])
+                except (TypeError, ValueError):
+                    pass
+        except Exception as e:
+            error("ERROR: Unable to fetch cluster topology, client affinity disabled until it can be fetched: %s" % e)
+            self.topology_failed = True
+            return
+
+        with self.lock:
+            self.partition_leaders = leaders
+            self.hashinator = hashinator
+            self.procedures = procedures
+
+    def __drop_failed(self):
+        with self.lock:
+            failed = [c for c in self.connections if c.reader_failure is not None]
+            for fser in failed:
+                error("ERROR: Lost connection to %s:%s: %s" % (fser.host, fser.port, fser.reader_failure))
+                self.connections.remove(fser)
+                self.down.append((fser.host, fser.port))
+        # outside the lock, a callback running on the reader thread may be
+        # waiting for it
+        for fser in failed:
+            try:
+                fser.close()
+            except Exception:
+                pass
+        return len(failed) > 0
+
+    def select(self, procedure = None, params = None):
+        """Returns the connection to the leader of the partition for an
+        invocation of a single-partition procedure, or else the live
+        connection with the fewest outstanding requests.
+        """
+
+        # not under the lock: closing the connections dropped joins their
+        # reader threads, whose callbacks may be waiting for it
+        self.__drop_failed()
+        with self.lock:
+            count = len(self.connections)
+            if count == 0:
+                raise IOError("No Connection")
+            if self.hashinator is not None and procedure is not None:
+                leader = self.__leader(procedure, params)
+                if leader is not None:
+                    return leader
+            # start the search at a different connection each time so that
+            # idle connections share the load
+            self.rotation = (self.rotation + 1) % count
+            candidates = self.connections[self.rotation:] + self.connections[:self.rotation]
+        return min(candidates, key=lambda c: len(c.pending))
+
+    def __leader(self, procedure, params):
+        info = self.procedures.get(procedure.name)
+        if not info or not info.get("singlePartition"):
+            return None
+        index = info.get("partitionParameter", -1)
+        if index < 0 or index >= len(params):
+            return None
+        paramtype = info.get("partitionParameterType", procedure.paramtypes[index])
+        try:
+            partition = self.hashinator.partition_for_value(paramtype, params[index])
+        except (TypeError, ValueError):
+            return None
+        host_id = self.partition_leaders.get(partition)
+        for fser in self.connections:
+            if fser.host_id == host_id:
+                return fser
+        return None
+
+    def is_pipelined(self):
+        return True
+
+    def invoke(self, procedure, params, callback = None):
+        """As FastSerializer.invoke(), on the connection chosen by select()."""
+
+        try:
+            fser = self.select(procedure, params)
+        except IOError as err:
+            future = futures.Future()
+            future.set_result(VoltResponse.lost(str(err)))
+            if callback is not None:
+                callback(future.result())
+            return future
+        return fser.invoke(procedure, params, callback)
+
+    def invoke_many(self, procedure, param_rows, callback = None):
+        """As FastSerializer.invoke_many(), with the invocations grouped by
+        the connection chosen by select() for each of them. If an invocation
+        can not be serialized, the futures attribute of the error has None
+        for the invocations which were not sent.
+        """
+
+        param_rows = list(param_rows)
+        result = [None] * len(param_rows)
+        batches = {}  # connection -> indexes of its invocations
+        for i, params in enumerate(param_rows):
+            try:
+                fser = self.select(procedure, params)
+            except IOError as err:
+                future = futures.Future()
+                future.set_result(VoltResponse.lost(str(err)))
+                if callback is not None:
+                    callback(future.result())
+                result[i] = future
+                continue
+            batches.setdefault(fser, []).append(i)
+        for fser, indexes in batches.items():
+            try:
+                batch = fser.invoke_many(procedure, [param_rows[i] for i in indexes], callback)
+            except Exception as e:
+                if hasattr(e, "futures"):
+                    for i, future in zip(indexes, e.futures):
+                        result[i] = future
+                    e.futures = result
+                raise
+            for i, future in zip(indexes, batch):
+                result[i] = future
+        return result
+
+    def cancel(self, future):
+        with self.lock:
+            connections = list(self.connections)
+        return any(fser.cancel(future) for fser in connections)
+
+    def outstanding(self):
+        """Returns the number of outstanding requests on each live connection
+        as a dict keyed by (host, port).
+        """
+
+        with self.lock:
+            return dict(((c.host, c.port), len(c.pending)) for c in self.connections)
+
+    def close(self):
+        self.closing.set()
+        if self.monitor is not threading.current_thread():
+            self.monitor.join()
+        with self.lock:
+            connections, self.connections = self.connections, []
+        for fser in connections:
+            fser.close()
+
+class VoltBulkLoader:
+    """Loads rows into a table with the system procedures
+    @LoadSinglepartitionTable, for partitioned tables, and
+    @LoadMultipartitionTable, for replicated ones.
+
+    Rows added with insert() are grouped by partition and sent in batches of
+    batch_size rows, with up to concurrency batches outstanding. Each batch
+    is a VoltTable parameter, written straight into the write buffer of the
+    connection it is sent on.
+    """
+
+    # VoltDB types of the TYPE_NAME column of @SystemCatalog COLUMNS
+    TYPE_NAMES = {"TINYINT": FastSerializer.VOLTTYPE_TINYINT,
+                  "SMALLINT": FastSerializer.VOLTTYPE_SMALLINT,
+                  "INTEGER": FastSerializer.VOLTTYPE_INTEGER,
+                  "BIGINT": FastSerializer.VOLTTYPE_BIGINT,
+                  "FLOAT": FastSerializer.VOLTTYPE_FLOAT,
+                  "DECIMAL": FastSerializer.VOLTTYPE_DECIMAL,
+                  "VARCHAR": FastSerializer.VOLTTYPE_STRING,
+                  "VARBINARY": FastSerializer.VOLTTYPE_VARBINARY,
+                  "TIMESTAMP": FastSerializer.VOLTTYPE_TIMESTAMP,
+                  "GEOGRAPHY_POINT": FastSerializer.VOLTTYPE_GEOGRAPHY_POINT,
+                  "GEOGRAPHY": FastSerializer.VOLTTYPE_GEOGRAPHY}
+
+    def __init__(self, client, table, batch_size = 1000, concurrency = 4, upsert = False):
+        """
+        :param client: FastSerializer or VoltClient
+        :param table: name of the table to load
+        :param batch_size: number of rows sent in one invocation
+        :param concurrency: number of invocations outstanding at most
+        :param upsert: replace the rows whose primary key exists instead of failing
+        """
+        self.client = client
+        self.table = table
+        self.batch_size = batch_size
+        self.upsert = upsert and 1 or 0
+
+        self.columns, self.partition_column = self.describe_table(client, table)
+        self.hashinator = None
+        if self.partition_column is not None:
+            self.hashinator = getattr(client, "hashinator", None) or self.__fetchHashinator()
+            self.partition_type = self.columns[self.partition_column].type
+
+        self.single = VoltProcedure(client, "@LoadSinglepartitionTable",
+                                    [FastSerializer.VOLTTYPE_VARBINARY,
+                                     FastSerializer.VOLTTYPE_STRING,
+                                     FastSerializer.VOLTTYPE_TINYINT,
+                                     FastSerializer.VOLTTYPE_VOLTTABLE])
+        self.multi = VoltProcedure(client, "@LoadMultipartitionTable",
+                                   [FastSerializer.VOLTTYPE_STRING,
+                                    FastSerializer.VOLTTYPE_TINYINT,
+                                    FastSerializer.VOLTTYPE_VOLTTABLE])
+
+        self.concurrency = concurrency
+        self.permits = threading.BoundedSemaphore(concurrency)
+        self.lock = threading.Lock()
+        self.batches = {}   # partition (None if replicated) -> rows not sent
+        self.keys = {}      # partition -> partitioning key of its batch
+        self.loaded = 0     # rows loaded
+        self.failures = []  # (rows, VoltResponse) of the batches which failed
+
+    @classmethod
+    def describe_table(cls, client, table):
+        """Returns the columns of table, as a list of VoltColumn objects, and
+        the position of its partitioning column, None if it is replicated,
+        from @SystemCatalog.
+        """
+
+        catalog = VoltProcedure(client, "@SystemCatalog", [FastSerializer.VOLTTYPE_STRING])
+        name = table.upper()
+
+        response = catalog.call(["COLUMNS"])
+        if response.status != 1:
+            raise RuntimeError(response.statusString)
+        rows = cls.__catalogRows(response.tables[0], name)
+        if not rows:
+            raise ValueError("Table %s not found" % table)
+        rows.sort(key = lambda row: row["ORDINAL_POSITION"])
+        columns = []
+        for row in rows:
+            if row["TYPE_NAME"] not in cls.TYPE_NAMES:
+                raise ValueError("Column %s has unsupported type %s" % (row["COLUMN_NAME"], row["TYPE_NAME"]))
+            columns.append(VoltColumn(type = cls.TYPE_NAMES[row["TYPE_NAME"]], name = row["COLUMN_NAME"]))
+
+        response = catalog.call(["TABLES"])
+        if response.status != 1:
+            raise RuntimeError(response.statusString)
+        partition_column = None
+        for row in cls.__catalogRows(response.tables[0], name):
+            try:
+                remarks = json.loads(row["REMARKS"] or "{}")
+            except ValueError:
+                continue
+            if remarks.get("partitionColumn"):
+                names = [column.name for column in columns]
+                partition_column = names.index(remarks["partitionColumn"].upper())
+        return columns, partition_column
+
+    @staticmethod
+    def __catalogRows(table, name):
+        names = [column.name for column in table.columns]
+        return [dict(zip(names, row)) for row in table.tuples if row[names.index("TABLE_NAME")] == name]
+
+    def __fetchHashinator(self):
+        topo = VoltProcedure(self.client, "@Statistics",
+                             [FastSerializer.VOLTTYPE_STRING,
+                              FastSerializer.VOLTTYPE_TINYINT]).call(["TOPO", 0])
+        if topo.status != 1:
+            raise RuntimeError(topo.statusString)
+        return Hashinator(topo.tables[1].tuples[0][0], topo.tables[1].tuples[0][1])
+
+    def insert(self, row):
+        """Adds a row, a list of values in the order of the columns of the
+        table. The batch of its partition is sent once it is full, after
+        waiting for an outstanding batch to complete if there are already
+        concurrency of them.
+        """
+
+        partition = key = None
+        if self.partition_column is not None:
+            value = row[self.partition_column]
+            partition = self.hashinator.partition_for_value(self.partition_type, value)
+            key = Hashinator.partition_key(self.partition_type, value)
+        with self.lock:
+            batch = self.batches.get(partition)
+            if batch is None:
+                batch = self.batches[partition] = []
+                self.keys[partition] = key
+            batch.append(row)
+            if len(batch) < self.batch_size:
+                return
+            del self.batches[partition]
+            key = self.keys.pop(partition)
+        self.__send(partition, key, batch)
+
+    def insert_many(self, rows):
+        for row in rows:
+            self.insert(row)
+
+    def __send(self, partition, key, rows):
+        table = VoltTable(None)
+        table.columns = self.columns
+        table.tuples = rows
+
+        def completed(response):
+            with self.lock:
+                if response.status == 1:
+                    self.loaded += len(rows)
+                else:
+                    self.failures.append((rows, response))
+            self.permits.release()
+
+        self.permits.acquire()
+        try:
+            if partition is None:
+                self.multi.call_async([self.table, self.upsert, table], completed)
+            else:
+                self.single.call_async([key, self.table, self.upsert, table], completed)
+        except:
+            self.permits.release()
+            raise
+
+    def flush(self):
+        """Sends the rows not sent yet and waits for all the batches to
+        complete.
+        """
+
+        with self.lock:
+            batches, self.batches = self.batches, {}
+            keys, self.keys = self.keys, {}
+        for partition, rows in batches.items():
+            self.__send(partition, keys[partition], rows)
+        for i in range(self.concurrency):
+            self.permits.acquire()
+        for i in range(self.concurrency):
+            self.permits.release()
+
+    def close(self):
+        self.flush()
+
+class AsyncFastSerializer(FastSerializer):
+    """FastSerializer for use with asyncio. The connection is made by
+    awaiting connect(); invocations from many coroutines may be outstanding
+    on the one connection at the same time.
+    """
+
+    def __init__(self, host,
+                 port = 21212,
+                 usessl = False,
+                 username = "",
+                 password = "",
+                 dump_file_path = None,
+                 connect_timeout = 8,
+                 procedure_timeout = None,
+                 ssl_config_file = None,
+                 default_cacerts = True,
+                 table_mode = None,
+                 row_type = None,
+                 timestamp_mode = None,
+                 stats = None,
+                 tracer = None):
+        """
+        :param host: host string for connection
+        :param port: port for connection
+        :param usessl: switch for use ssl or not
+        :param username: authentication user name for connection or None
+        :param password: authentication password for connection or None
+        :param dump_file_path: path of a capture file of the messages sent and received (see CaptureWriter) or None
+        :param connect_timeout: timeout (secs) or None for connection and authentication (default=8)
+        :param procedure_timeout: timeout (secs) or None for procedure calls (default=None)
+        :param ssl_config_file: config file that defines java keystore and truststore files
+        :param default_cacerts: if true, use installation default cacerts when truststore unspecified
+        :param table_mode: how tables are decoded, TABLE_ROWS (default), TABLE_COLUMNAR or TABLE_LAZY
+        :param row_type: type of the rows of tables, ROW_LIST (default), ROW_TUPLE or ROW_NAMEDTUPLE
+        :param timestamp_mode: how timestamps are decoded, TIMESTAMP_LOCAL (default), TIMESTAMP_UTC,
+                               TIMESTAMP_RAW or TIMESTAMP_DATETIME64
+        :param stats: ClientStats in which to record the invocations, or None
+        :param tracer: CallTracer to which the phases of the invocations are reported, or None
+        """
+        # no host, so the base class does not open a socket
+        FastSerializer.__init__(self, usessl = usessl,
+                                dump_file_path = dump_file_path,
+                                procedure_timeout = procedure_timeout,
+                                ssl_config_file = ssl_config_file,
+                                default_cacerts = default_cacerts,
+                                table_mode = table_mode,
+                                row_type = row_type,
+                                timestamp_mode = timestamp_mode,
+                                stats = stats,
+                                tracer = tracer)
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.connect_timeout = connect_timeout
+        self.stream_reader = None
+        self.stream_writer = None
+        self.reader_task = None
+
+    async def connect(self):
+        """Connects to the server and authenticates."""
+
+        ssl_context = None
+        if self.usessl:
+            if not ssl_available:
+                error("ERROR: To use SSL functionality please install the Python ssl module.")
+                raise ssl_exception
+            ssl_context = self.ssl_context()
+        try:
+            self.stream_reader, self.stream_writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl = ssl_context),
+                self.connect_timeout)
+        except Exception:
+            error("ERROR: Failed to connect to %s port %s" % (self.host, self.port))
+            raise
+        if not self.username is None and not self.password is None:
+            if self.capture is not None:
+                self.capture.login = True
+            try:
+                await asyncio.wait_for(self.__authenticate(), self.connect_timeout)
+            except asyncio.TimeoutError:
+                raise RuntimeError("Authentication timed out after %d seconds."
+                                   % self.connect_timeout)
+            if self.capture is not None:
+                self.capture.login = False
+        self.reader_task = asyncio.get_running_loop().create_task(self.__read_responses())
+        return self
+
+    async def __authenticate(self):
+        self.writeLoginRequest(self.username, self.password)
+        self.stream_writer.write(self.takeRawBytes())
+        try:
+            await self.__buffer_for_read()
+        except IOError as e:
+            error("ERROR: Connection failed. Please check that the host, port, and ssl settings are correct.")
+            raise e
+        version = self.readByte()
+        status = self.readByte()
+        if version == self.AUTH_HANDSHAKE_VERSION:
+            raise RuntimeError("Kerberos authentication is not supported by AsyncFastSerializer.")
+        self.readLoginResponse(status)
+
+    async def __buffer_for_read(self):
+        try:
+            responseprefix = await self.stream_reader.readexactly(4)
+            responseLength = self.int32Struct.unpack(responseprefix)[0]
+            message = await self.stream_reader.readexactly(responseLength)
+        except asyncio.IncompleteReadError:
+            raise IOError("Connection broken")
+        self.bufferFromBytes(responseprefix, message)
+
+    async def __read_responses(self):
+        try:
+            while True:
+                await self.__buffer_for_read()
+                response = VoltResponse(None)
+                if self.tracer is None:
+                    response.deserializeBuffered(self)
+                else:
+                    received = time.perf_counter_ns()
+                    response.deserializeBuffered(self)
+                    self.trace_response(response, received)
+                future = self.pending.pop(response.clientHandle, None)
+                if future is not None and not future.done():
+                    self.record_response(response)
+                    future.set_result(response)
+        except asyncio.CancelledError:
+            reason = "Connection closed"
+        except Exception as e:
+            reason = str(e) or "Connection broken"
+        self.reader_failure = reason
+        pending, self.pending = self.pending, {}
+        for handle, future in pending.items():
+            if not future.done():
+                response = VoltResponse.lost(reason)
+                self.record_response(response, handle)
+                future.set_result(response)
+
+    def is_pipelined(self):
+        return True
+
+    def __send(self):
+        # hands the write buffer to the transport, which sends what it can
+        # at once
+        traced = self.wbuf.traced
+        if traced is None:
+            self.stream_writer.write(self.takeRawBytes())
+            return
+        self.trace_sending(traced)
+        try:
+            self.stream_writer.write(self.takeRawBytes())
+        finally:
+            self.trace_sent(traced)
+
+    async def invoke(self, procedure, params, timeout = None):
+        """Sends an invocation of procedure and waits for the VoltResponse.
+        Other coroutines may invoke procedures on this connection while the
+        response is outstanding.
+        """
+
+        if self.stream_writer is None:
+            error("ERROR: not connected to server.")
+            raise IOError("No Connection")
+        if self.reader_failure is not None:
+            return VoltResponse.lost(self.reader_failure)
+        handle = next(self.handles)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[handle] = future
+        try:
+            procedure.writeInvocation(self, params, handle)
+            self.__send()
+        except:
+            self.pending.pop(handle, None)
+            self.timings.pop(handle, None)
+            self.wbuf.clear()
+            raise
+        try:
+            await self.stream_writer.drain()
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.record_timeout(handle)
+            return VoltResponse.failed("timeout: procedure call took longer than %d seconds" % timeout)
+        except IOError as err:
+            response = VoltResponse.lost(str(err))
+            self.record_response(response, handle)
+            return response
+        finally:
+            self.pending.pop(handle, None)
+
+    async def invoke_many(self, procedure, param_rows, timeout = None):
+        """As invoke(), for one invocation of procedure per list of
+        parameters in param_rows, sent with a single write. Returns the list
+        of VoltResponse objects in the order of param_rows. If an invocation
+        can not be serialized, the ones before it are sent, and the error is
+        raised with their responses as its responses attribute.
+        """
+
+        if self.stream_writer is None:
+            error("ERROR: not connected to server.")
+            raise IOError("No Connection")
+        if self.reader_failure is not None:
+            return [VoltResponse.lost(self.reader_failure) for params in param_rows]
+        loop = asyncio.get_running_loop()
+        handles = []
+        invalid = None  # error serializing the row after the ones sent
+        try:
+            for params in param_rows:
+                handle = next(self.handles)
+                position = self.wbuf.tell()
+                try:
+                    procedure.writeInvocation(self, params, handle)
+                except Exception as e:
+                    # drop what was written of it, the ones before it are sent
+                    self.wbuf.truncate(position)
+                    invalid = e
+                    break
+                self.pending[handle] = loop.create_future()
+                handles.append(handle)
+            if handles:
+                self.__send()
+        except:
+            for handle in handles:
+                self.pending.pop(handle, None)
+                self.timings.pop(handle, None)
+            self.wbuf.clear()
+            raise
+        responses = await self.__responses(handles, timeout) if handles else []
+        if invalid is not None:
+            invalid.responses = responses
+            raise invalid
+        return responses
+
+    async def __responses(self, handles, timeout):
+        # the responses to the invocations sent with handles
+        pending = [self.pending[handle] for handle in handles]
+        try:
+            await self.stream_writer.drain()
+            done, not_done = await asyncio.wait(pending, timeout = timeout)
+        except IOError as err:
+            responses = [VoltResponse.lost(str(err)) for handle in handles]
+            for handle, response in zip(handles, responses):
+                self.record_response(response, handle)
+            return responses
+        finally:
+            for handle in handles:
+                self.pending.pop(handle, None)
+        for handle, future in zip(handles, pending):
+            if not future.done():
+                self.record_timeout(handle)
+        return [future.result() if future.done() else
+                VoltResponse.failed("timeout: procedure call took longer than %d seconds" % timeout)
+                for future in pending]
+
+    async def close(self):
+        if self.reader_task is not None:
+            self.reader_task.cancel()
+            try:
+                await self.reader_task
+            except asyncio.CancelledError:
+                pass
+        if self.stream_writer is not None:
+            self.stream_writer.close()
+            try:
+                await self.stream_writer.wait_closed()
+            except Exception:
+                pass
+        if self.capture is not None:
+            self.capture.close()
+
+class AsyncVoltProcedure(VoltProcedure):
+    "VoltDB called procedure interface for use with AsyncFastSerializer"
+
+    async def call(self, params = None, response = True, timeout = None):
+        if timeout is None:
+            timeout = self.fser.procedure_timeout
+        res = await self.fser.invoke(self, params, timeout)
+        return response and res or None
+
+    async def call_many(self, param_rows, response = True, timeout = None):
+        if timeout is None:
+            timeout = self.fser.procedure_timeout
+        res = await self.fser.invoke_many(self, param_rows, timeout)
+        return res if response else None
+
+    def call_async(self, params = None, callback = None):
+        """Schedules call() as a task. If callback is given it is called
+        with the VoltResponse when the task completes.
+        """
+
+        task = asyncio.ensure_future(self.call(params))
+        if callback is not None:
+            task.add_done_callback(lambda t: t.cancelled() or callback(t.result()))
+        return task
+
 # Reads a properties file that is broadly compatible
 # with the forms supported by Java, in particular for
 # allowable separators between key and value. Note,
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# This file is part of VoltDB.
+# Copyright (C) 2008-2025 Volt Active Data Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with VoltDB.  If not, see <http://www.gnu.org/licenses/>.
+
+# Loads delimited files into a table, with @LoadSinglepartitionTable and
+# @LoadMultipartitionTable, or through a stored procedure called once per
+# line. Fields are converted according to the column types found with
+# @SystemCatalog, and many invocations are kept outstanding.
+
+import sys
+if sys.hexversion < 0x03060000:
+    raise Exception("Python version 3.6 or greater is required (3.9+ is preferred).")
+
+import argparse
+import csv
+import datetime
+import decimal
+import threading
+import time
+
+from voltdbclient import FastSerializer, VoltBulkLoader, VoltClient, VoltColumn, VoltProcedure
+
+# Values of a field which are loaded as NULL
+NULL_FIELDS = ("", "\\N", "NULL")
+
+def parse_timestamp(field):
+    # microseconds since the epoch, or an ISO 8601 date and time
+    if field.lstrip("-").isdigit():
+        return int(field)
+    return datetime.datetime.fromisoformat(field)
+
+CONVERTERS = {FastSerializer.VOLTTYPE_TINYINT: int,
+              FastSerializer.VOLTTYPE_SMALLINT: int,
+              FastSerializer.VOLTTYPE_INTEGER: int,
+              FastSerializer.VOLTTYPE_BIGINT: int,
+              FastSerializer.VOLTTYPE_FLOAT: float,
+              FastSerializer.VOLTTYPE_DECIMAL: decimal.Decimal,
+              FastSerializer.VOLTTYPE_STRING: str,
+              FastSerializer.VOLTTYPE_VARBINARY: bytes.fromhex,
+              FastSerializer.VOLTTYPE_TIMESTAMP: parse_timestamp}
+
+def converter(column):
+    if column.type not in CONVERTERS:
+        raise ValueError("Column %s has a type which can not be loaded from text (%d)" % (column.name, column.type))
+    convert = CONVERTERS[column.type]
+    return lambda field: None if field in NULL_FIELDS else convert(field)
+
+def procedure_parameters(client, procedure):
+    # the parameters of procedure, as VoltColumn objects, from @SystemCatalog
+    response = VoltProcedure(client, "@SystemCatalog",
+                             [FastSerializer.VOLTTYPE_STRING]).call(["PROCEDURECOLUMNS"])
+    if response.status != 1:
+        raise RuntimeError(response.statusString)
+    table = response.tables[0]
+    names = [column.name for column in table.columns]
+    rows = [dict(zip(names, row)) for row in table.tuples
+            if row[names.index("PROCEDURE_NAME")] == procedure]
+    if not rows:
+        raise ValueError("Procedure %s not found" % procedure)
+    rows.sort(key = lambda row: row["ORDINAL_POSITION"])
+    columns = []
+    for row in rows:
+        if row["TYPE_NAME"] not in VoltBulkLoader.TYPE_NAMES:
+            raise ValueError("Parameter %s has unsupported type %s" % (row["COLUMN_NAME"], row["TYPE_NAME"]))
+        columns.append(VoltColumn(type = VoltBulkLoader.TYPE_NAMES[row["TYPE_NAME"]], name = row["COLUMN_NAME"]))
+    return columns
+
+class ProcedureLoader:
+    """Calls a procedure for each row, with up to max_outstanding calls
+    outstanding, sent in batches of batch_size calls.
+    """
+
+    def __init__(self, client, procedure, paramtypes, batch_size, max_outstanding):
+        self.procedure = VoltProcedure(client, procedure, paramtypes)
+        self.client = client
+        self.batch_size = batch_size
+        self.max_outstanding = max_outstanding
+        self.permits = threading.BoundedSemaphore(max_outstanding)
+        self.lock = threading.Lock()
+        self.batch = []
+        self.loaded = 0
+        self.failures = []
+
+    def __completed(self, response):
+        with self.lock:
+            if response.status == 1:
+                self.loaded += 1
+            else:
+                self.failures.append((None, response))
+        self.permits.release()
+
+    def insert(self, row):
+        if not self.permits.acquire(blocking = False):
+            # the rows of the batch hold permits too, they are sent to be
+            # released
+            if self.batch:
+                self.__send()
+            self.permits.acquire()
+        self.batch.append(row)
+        if len(self.batch) >= self.batch_size:
+            self.__send()
+
+    def __send(self):
+        batch, self.batch = self.batch, []
+        self.client.invoke_many(self.procedure, batch, self.__completed)
+
+    def close(self):
+        if self.batch:
+            self.__send()
+        for i in range(self.max_outstanding):
+            self.permits.acquire()
+        for i in range(self.max_outstanding):
+            self.permits.release()
+
+class Progress:
+    "periodic report of the rows read and loaded, and of the backpressure"
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.start = self.last = time.time()
+        self.rows = self.last_rows = 0
+        self.errors = 0     # lines which could not be converted
+        self.blocked = 0.0  # seconds waiting to send
+
+    def report(self, loader, final = False):
+        now = time.time()
+        if not final and now - self.last < self.interval:
+            return
+        elapsed = max(now - self.last, 1e-6)
+        total = max(now - self.start, 1e-6)
+        rate = (self.rows - self.last_rows) / elapsed
+        if final:
+            rate = self.rows / total
+        print("%d rows read, %d invalid, %d loaded, %d failed | %.0f rows/sec | blocked %.0f%% of the time" %
+              (self.rows, self.errors, loader.loaded, len(loader.failures), rate, 100 * self.blocked / total))
+        sys.stdout.flush()
+        self.last = now
+        self.last_rows = self.rows
+
+def load(loader, columns, files, options, progress):
+    converters = [converter(column) for column in columns]
+    for path in files:
+        with (sys.stdin if path == "-" else open(path, newline = "", encoding = options.encoding)) as input:
+            reader = csv.reader(input, delimiter = options.separator, quotechar = options.quotechar,
+                                skipinitialspace = options.trim)
+            for line, fields in enumerate(reader, 1):
+                if line <= options.skip:
+                    continue
+                try:
+                    if len(fields) != len(converters):
+                        raise ValueError("%d fields for %d columns" % (len(fields), len(converters)))
+                    row = [convert(field) for convert, field in zip(converters, fields)]
+                except (ValueError, ArithmeticError) as e:
+                    progress.errors += 1
+                    sys.stderr.write("%s:%d: %s\n" % (path, line, e))
+                    if progress.errors > options.max_errors:
+                        sys.stderr.write("Too many errors, stopping\n")
+                        return False
+                    continue
+                before = time.time()
+                loader.insert(row)
+                progress.blocked += time.time() - before
+                progress.rows += 1
+                if progress.rows % 1024 == 0:
+                    progress.report(loader)
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description = "Load delimited files into a VoltDB table.")
+    parser.add_argument("table", help = "table to load, or procedure to call with --procedure")
+    parser.add_argument("files", nargs = "*", default = ["-"], help = "files to load, - or none for the standard input")
+    parser.add_argument("--servers", default = "localhost", help = "comma separated list of host[:port] (default: localhost)")
+    parser.add_argument("--port", type = int, default = 21212, help = "port of servers which do not specify one (default: 21212)")
+    parser.add_argument("--user", default = "", help = "user name")
+    parser.add_argument("--password", default = "", help = "password")
+    parser.add_argument("--ssl", metavar = "CONFIG_FILE", help = "use TLS, with the keystore and truststore of CONFIG_FILE")
+    parser.add_argument("--procedure", action = "store_true", help = "call the procedure TABLE once per line instead of loading a table")
+    parser.add_argument("--separator", default = ",", help = "field separator (default: ,)")
+    parser.add_argument("--quotechar", default = '"', help = 'quote character (default: ")')
+    parser.add_argument("--trim", action = "store_true", help = "ignore spaces after separators")
+    parser.add_argument("--skip", type = int, default = 0, help = "number of header lines to skip in each file")
+    parser.add_argument("--encoding", default = "utf-8", help = "encoding of the files (default: utf-8)")
+    parser.add_argument("--batch", type = int, default = 200, help = "rows per invocation, or invocations per write with --procedure (default: 200)")
+    parser.add_argument("--max-outstanding", type = int,
+                        help = "batches outstanding at most, or invocations with --procedure (default: 8, or 1000)")
+    parser.add_argument("--upsert", action = "store_true", help = "replace rows whose primary key exists")
+    parser.add_argument("--max-errors", type = int, default = 100, help = "lines which can not be converted before stopping (default: 100)")
+    parser.add_argument("--report", type = float, default = 5, help = "seconds between progress reports (default: 5)")
+    options = parser.parse_args()
+
+    kwargs = {"username": options.user, "password": options.password}
+    if options.ssl:
+        kwargs.update(usessl = True, ssl_config_file = options.ssl)
+    client = VoltClient(options.servers, port = options.port, **kwargs)
+    try:
+        if options.procedure:
+            columns = procedure_parameters(client, options.table)
+            loader = ProcedureLoader(client, options.table, [column.type for column in columns],
+                                     options.batch, options.max_outstanding or 1000)
+        else:
+            loader = VoltBulkLoader(client, options.table, batch_size = options.batch,
+                                    concurrency = options.max_outstanding or 8, upsert = options.upsert)
+            columns = loader.columns
+        progress = Progress(options.report)
+        completed = load(loader, columns, options.files, options, progress)
+        loader.close()
+        progress.report(loader, final = True)
+        for rows, response in loader.failures[:10]:
+            sys.stderr.write("Failed: %s\n" % response.statusString)
+        return 0 if completed and not loader.failures and not progress.errors else 1
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    exit(main())
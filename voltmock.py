@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# This file is part of VoltDB.
+# Copyright (C) 2008-2025 Volt Active Data Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with VoltDB.  If not, see <http://www.gnu.org/licenses/>.
+
+# A stand-in for a VoltDB server, on asyncio, to exercise the client without
+# a cluster: it accepts the login of FastSerializer.authenticate() and
+# answers invocations with canned tables, after configurable delays, or with
+# errors. Invocations on a connection are answered independently of each
+# other, so pipelined invocations with different delays complete out of
+# order, as they would on a server.
+
+import sys
+if sys.hexversion < 0x03060000:
+    raise Exception("Python version 3.6 or greater is required (3.9+ is preferred).")
+
+import argparse
+import asyncio
+import collections
+import hashlib
+import struct
+import threading
+
+from voltdbclient import FastSerializer, VoltColumn, VoltTable
+
+# VoltResponse.status values, as in ClientResponse.java
+SUCCESS = 1
+USER_ABORT = -1
+GRACEFUL_FAILURE = -2
+UNEXPECTED_FAILURE = -3
+
+# What the server answers to invocations of a procedure:
+#   tables: the VoltTable objects of the response
+#   delay: seconds before answering
+#   status, status_string: the status of the response
+#   handler: if not None, called with the parameters of each invocation,
+#            arrays as lists, it returns the tables of the response instead;
+#            an exception it raises is answered as a graceful failure
+#   disconnect: close the connection instead of answering
+MockProcedure = collections.namedtuple("MockProcedure",
+                                       ["tables", "delay", "status", "status_string", "handler", "disconnect"])
+
+def table(columns, rows):
+    """Returns a VoltTable with columns, a list of (name, type) pairs, and
+    rows, a list of lists of values.
+    """
+
+    result = VoltTable(FastSerializer())
+    result.columns = [VoltColumn(type = type, name = name) for name, type in columns]
+    result.tuples = [list(row) for row in rows]
+    return result
+
+class MockServer:
+    """Stand-in for a VoltDB server. Procedures are declared with
+    add_procedure(); invocations of other procedures fail as on a server,
+    unless a default is declared. Serve it with await start() in an event
+    loop, or with run_in_thread() from synchronous code.
+    """
+
+    AUTH_FAILURE = -1  # login response status when the password is wrong
+
+    HEADER = struct.Struct(">ibqbb")  # length, version, client handle, fields, status
+    TRAILER = struct.Struct(">bih")   # app status, roundtrip time, table count
+    STRING_LENGTH = struct.Struct(">i")
+    HANDLE = struct.Struct(">q")
+
+    def __init__(self, host = "127.0.0.1", port = 0, users = None, host_id = 0):
+        """
+        :param host: address to listen on
+        :param port: port to listen on, 0 for any free port
+        :param users: dict of user names to passwords allowed to log in, or None to allow anyone
+        :param host_id: host id reported to clients at login
+        """
+        self.host = host
+        self.port = port
+        self.users = users
+        self.host_id = host_id
+        # procedure name, or None for the others -> (MockProcedure, (table count, serialized tables))
+        self.procedures = {}
+        self.add_procedure("@Ping")
+        self.invocations = collections.Counter()  # procedure name -> invocations received
+        self.server = None
+        self.loop = None
+        self.thread = None
+        self.connections = {}  # StreamWriter -> task serving the connection
+
+    def add_procedure(self, name, tables = (), delay = 0, status = SUCCESS, status_string = None,
+                      handler = None, disconnect = False):
+        """Declares how invocations of the procedure name, or with None of
+        the procedures not declared, are answered, see MockProcedure.
+        """
+
+        procedure = MockProcedure(list(tables), delay, status, status_string, handler, disconnect)
+        self.procedures[name] = (procedure, self.__serialize(procedure.tables))
+
+    def __serialize(self, tables):
+        # tables serialized once, for every response that includes them
+        fser = FastSerializer()
+        for t in tables:
+            t.writeToSerializer(fser)
+        return len(tables), fser.takeRawBytes()
+
+    def response(self, handle, status, status_string, tables, roundtrip = 0):
+        """Returns the message of a response with client handle handle, and
+        tables, a list of VoltTable objects or a (table count, serialized
+        tables) pair.
+        """
+
+        if isinstance(tables, list):
+            tables = self.__serialize(tables)
+        count, data = tables
+        fields = 0
+        string = b""
+        if status_string is not None:
+            fields |= 1 << 5
+            encoded = status_string.encode("utf-8")
+            string = self.STRING_LENGTH.pack(len(encoded)) + encoded
+        length = 1 + 8 + 1 + 1 + len(string) + self.TRAILER.size + len(data)
+        return b"".join((self.HEADER.pack(length, 0, handle, fields, status), string,
+                         self.TRAILER.pack(-128, roundtrip, count), data))
+
+    def login_response(self, status):
+        fser = FastSerializer()
+        fser.writeByte(0)       # version
+        fser.writeByte(status)
+        if status == 0:
+            fser.writeInt32(self.host_id)
+            fser.writeInt64(len(self.connections))  # connection id
+            fser.writeInt64(0)  # cluster start timestamp
+            fser.writeInt32(0x7f000001)  # leader address
+            fser.writeString("voltmock")
+        fser.prependLength()
+        return fser.takeRawBytes()
+
+    def __authenticated(self, message):
+        if self.users is None:
+            return True
+        fser = FastSerializer()
+        fser.bufferFromBytes(self.STRING_LENGTH.pack(len(message)), message)
+        fser.readByte()    # version
+        fser.readByte()    # hash
+        fser.readString()  # service
+        username = fser.readString()
+        password = self.users.get(username)
+        # the SHA-256 digest of the password ends the message
+        return password is not None and hashlib.sha256(password.encode("utf-8")).digest() == message[-32:]
+
+    async def start(self):
+        """Starts listening in the running event loop. Returns the (host,
+        port) it listens on.
+        """
+
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self.__serve, self.host, self.port)
+        self.host, self.port = self.server.sockets[0].getsockname()[:2]
+        return self.host, self.port
+
+    async def close(self):
+        "Stops listening and closes the connections."
+
+        self.server.close()
+        tasks = list(self.connections.values())
+        for writer in list(self.connections):
+            writer.close()
+        # the tasks end once they see their connection closed
+        await asyncio.gather(*tasks, return_exceptions = True)
+        await self.server.wait_closed()
+
+    def run_in_thread(self):
+        """Serves from an event loop in a background thread. Returns the
+        (host, port) it listens on.
+        """
+
+        started = threading.Event()
+        def run():
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(self.start())
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.close())
+            loop.close()
+        self.thread = threading.Thread(target = run, name = "voltmock")
+        self.thread.daemon = True
+        self.thread.start()
+        started.wait()
+        return self.host, self.port
+
+    def stop(self):
+        "Stops a server started with run_in_thread()."
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    async def __serve(self, reader, writer):
+        self.connections[writer] = asyncio.current_task()
+        try:
+            length = self.STRING_LENGTH.unpack(await reader.readexactly(4))[0]
+            if not self.__authenticated(await reader.readexactly(length)):
+                writer.write(self.login_response(self.AUTH_FAILURE))
+                return
+            writer.write(self.login_response(0))
+            while True:
+                length = self.STRING_LENGTH.unpack(await reader.readexactly(4))[0]
+                message = await reader.readexactly(length)
+                if not self.__answer(message, writer):
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.connections.pop(writer, None)
+            writer.close()
+
+    def __answer(self, message, writer):
+        # answers the invocation in message, returns False to disconnect
+        name_length = self.STRING_LENGTH.unpack_from(message, 1)[0]
+        name = message[5:5 + name_length].decode("utf-8")
+        handle = self.HANDLE.unpack_from(message, 5 + name_length)[0]
+        self.invocations[name] += 1
+        entry = self.procedures.get(name) or self.procedures.get(None)
+        if entry is None:
+            writer.write(self.response(handle, UNEXPECTED_FAILURE,
+                                       "Procedure %s was not found" % name, (0, b"")))
+            return True
+        procedure, tables = entry
+        if procedure.disconnect:
+            return False
+        if procedure.handler is not None:
+            try:
+                tables = procedure.handler(self.__parameters(message))
+            except Exception as e:
+                writer.write(self.response(handle, GRACEFUL_FAILURE, str(e), (0, b"")))
+                return True
+        response = self.response(handle, procedure.status, procedure.status_string, tables,
+                                 int(procedure.delay * 1000))
+        if procedure.delay:
+            self.loop.call_later(procedure.delay, self.__send, writer, response)
+        else:
+            writer.write(response)
+        return True
+
+    def __parameters(self, message):
+        # the parameters of the invocation in message, arrays as lists
+        fser = FastSerializer()
+        fser.bufferFromBytes(self.STRING_LENGTH.pack(len(message)), message)
+        fser.readByte()
+        fser.readString()
+        fser.readInt64()
+        params = []
+        for i in range(fser.readInt16()):
+            type = fser.readByte()
+            if type == FastSerializer.ARRAY:
+                params.append(list(fser.readArray(fser.readByte())))
+            else:
+                params.append(fser.read(type))
+        return params
+
+    def __send(self, writer, response):
+        if not writer.is_closing():
+            writer.write(response)
+
+def main():
+    parser = argparse.ArgumentParser(description = "Serve canned responses to VoltDB clients.")
+    parser.add_argument("--host", default = "127.0.0.1", help = "address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type = int, default = 21212, help = "port to listen on (default: 21212)")
+    parser.add_argument("--rows", type = int, default = 1, help = "rows of the table answered to every procedure (default: 1)")
+    parser.add_argument("--delay", type = float, default = 0, help = "seconds before answering (default: 0)")
+    options = parser.parse_args()
+
+    rows = [[i, "row %d" % i, i * 0.5] for i in range(options.rows)]
+    result = table([("ID", FastSerializer.VOLTTYPE_BIGINT), ("NAME", FastSerializer.VOLTTYPE_STRING),
+                    ("VALUE", FastSerializer.VOLTTYPE_FLOAT)], rows)
+    server = MockServer(options.host, options.port)
+    server.add_procedure(None, [result], delay = options.delay)
+    async def serve():
+        host, port = await server.start()
+        print("Serving on %s:%d" % (host, port))
+        sys.stdout.flush()
+        await server.server.serve_forever()
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
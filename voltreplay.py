@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# This file is part of VoltDB.
+# Copyright (C) 2008-2025 Volt Active Data Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with VoltDB.  If not, see <http://www.gnu.org/licenses/>.
+
+# Replays capture files written with the dump_file_path option of
+# FastSerializer: lists their records, decodes the responses they hold
+# again (a deterministic decoding benchmark), or sends the invocations they
+# hold to a server, e.g. a local stand-in, and compares the responses.
+
+import sys
+if sys.hexversion < 0x03060000:
+    raise Exception("Python version 3.6 or greater is required (3.9+ is preferred).")
+
+import argparse
+import time
+
+from voltdbclient import CaptureWriter, FastSerializer, VoltResponse, read_capture
+
+def response_header(data):
+    # the VoltResponse of a response message, whose rows are not decoded
+    fser = FastSerializer(table_mode = FastSerializer.TABLE_LAZY)
+    fser.bufferFromBytes(data[:4], data[4:])
+    response = VoltResponse(None)
+    response.deserializeBuffered(fser)
+    return response
+
+def invocation_name(data):
+    fser = FastSerializer()
+    fser.bufferFromBytes(data[:4], data[4:])
+    fser.readByte()
+    return fser.readString()
+
+def list_records(path):
+    first = None
+    for record in read_capture(path):
+        if first is None:
+            first = record.time
+        if record.flags & CaptureWriter.LOGIN:
+            description = "login"
+        elif record.flags & CaptureWriter.SENT:
+            description = invocation_name(record.data)
+        else:
+            response = response_header(record.data)
+            description = "status %d %s" % (response.status, response.statusString or "")
+        print("%12.6f %s %8d %9d  %s" % ((record.time - first) / 1e9,
+                                        "->" if record.flags & CaptureWriter.SENT else "<-",
+                                        record.handle, len(record.data), description))
+    return 0
+
+def decode(path, repeat, table_mode):
+    messages = [record.data for record in read_capture(path)
+                if record.flags & CaptureWriter.RECEIVED and not record.flags & CaptureWriter.LOGIN]
+    if not messages:
+        sys.stderr.write("No responses in %s\n" % path)
+        return 1
+    size = sum(len(data) for data in messages)
+    fser = FastSerializer(table_mode = table_mode)
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        for data in messages:
+            fser.bufferFromBytes(data[:4], data[4:])
+            VoltResponse(None).deserializeBuffered(fser)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print("%d responses, %d bytes | best of %d: %.6f seconds | %.0f responses/sec | %.1f MB/sec" %
+          (len(messages), size, repeat, best, len(messages) / best, size / best / 1e6))
+    return 0
+
+def send(path, options):
+    records = list(read_capture(path))
+    invocations = [record for record in records
+                   if record.flags & CaptureWriter.SENT and not record.flags & CaptureWriter.LOGIN]
+    expected = dict((record.handle, response_header(record.data).status) for record in records
+                    if record.flags & CaptureWriter.RECEIVED and not record.flags & CaptureWriter.LOGIN)
+    if not invocations:
+        sys.stderr.write("No invocations in %s\n" % path)
+        return 1
+    host, port = options.server, 21212
+    if ":" in host:
+        host, port = host.split(":")
+    fser = FastSerializer(host, int(port), username = options.user, password = options.password,
+                          procedure_timeout = options.timeout)
+    fser.socket.settimeout(options.timeout)
+    mismatches = 0
+    outstanding = 0
+    start = time.perf_counter()
+    try:
+        def receive():
+            response = VoltResponse(fser)
+            status = expected.get(response.clientHandle)
+            if status is not None and status != response.status:
+                sys.stderr.write("Handle %d: status %d instead of %d: %s\n" %
+                                 (response.clientHandle, response.status, status, response.statusString))
+                return 1
+            return 0
+        # the invocations are sent as captured, with their client handles,
+        # with up to max_outstanding of them waiting for their responses
+        for record in invocations:
+            fser.socket.sendall(record.data)
+            outstanding += 1
+            if outstanding >= options.max_outstanding:
+                mismatches += receive()
+                outstanding -= 1
+        while outstanding:
+            mismatches += receive()
+            outstanding -= 1
+    finally:
+        fser.close()
+    elapsed = time.perf_counter() - start
+    print("%d invocations in %.3f seconds | %.0f invocations/sec | %d responses with another status" %
+          (len(invocations), elapsed, len(invocations) / elapsed, mismatches))
+    return 0 if mismatches == 0 else 1
+
+def main():
+    parser = argparse.ArgumentParser(description = "Replay a capture file of the VoltDB Python client.")
+    parser.add_argument("mode", choices = ["list", "decode", "send"],
+                        help = "list the records, decode the responses, or send the invocations to --server")
+    parser.add_argument("capture", help = "capture file, written with the dump_file_path option")
+    parser.add_argument("--repeat", type = int, default = 5, help = "times the responses are decoded, the best is reported (default: 5)")
+    parser.add_argument("--table-mode", choices = [FastSerializer.TABLE_ROWS, FastSerializer.TABLE_COLUMNAR, FastSerializer.TABLE_LAZY],
+                        default = FastSerializer.TABLE_ROWS, help = "how tables are decoded (default: rows)")
+    parser.add_argument("--server", default = "localhost", help = "host[:port] to send the invocations to (default: localhost)")
+    parser.add_argument("--user", default = "", help = "user name")
+    parser.add_argument("--password", default = "", help = "password")
+    parser.add_argument("--max-outstanding", type = int, default = 100, help = "invocations outstanding at most (default: 100)")
+    parser.add_argument("--timeout", type = float, default = 10, help = "seconds to wait for a response (default: 10)")
+    options = parser.parse_args()
+
+    if options.mode == "list":
+        return list_records(options.capture)
+    if options.mode == "decode":
+        return decode(options.capture, options.repeat, options.table_mode)
+    return send(options.capture, options)
+
+if __name__ == "__main__":
+    exit(main())